@@ -433,7 +433,7 @@ def run_parallel(claude: ClaudeAgent, codex: CodexAgent, task: str, cwd: str) ->
 
 # ─── Goal-driven planning mode ────────────────────────────────────────────────
 def run_goal(goal: str, cwd: str, claude: ClaudeAgent, codex: CodexAgent,
-             plan_only: bool = False) -> None:
+             plan_only: bool = False, plan_cache: bool = False) -> None:
     from agent_collab.planner import generate_plan
     from agent_collab.plan_ui import edit_plan, print_plan
     from agent_collab.executor import execute_plan
@@ -457,7 +457,7 @@ def run_goal(goal: str, cwd: str, claude: ClaudeAgent, codex: CodexAgent,
     if spin_started:
         spin_t.start()
     try:
-        plan = generate_plan(goal, cwd)
+        plan = generate_plan(goal, cwd, use_cache=plan_cache)
     except KeyboardInterrupt:
         # User cancelled with Ctrl+C - return gracefully
         done.set()
@@ -1086,6 +1086,8 @@ def main(argv: list[str] | None = None) -> None:
     parser.add_argument("--codex",       action="store_true", help="Force Codex CLI")
     parser.add_argument("--parallel",    action="store_true", help="Run both agents simultaneously")
     parser.add_argument("--plan-only",   action="store_true", help="Generate plan without executing")
+    parser.add_argument("--plan-cache",  action="store_true",
+                       help="Adapt a cached plan for similar goals instead of planning from scratch")
     parser.add_argument("--resume",      nargs="?", const="PICKER", default=None,
                        help="Resume a session (shows picker if no session-id given)")
     parser.add_argument("--interactive", "-i", action="store_true", help="Interactive REPL mode (default if no goal)")
@@ -1130,7 +1132,7 @@ def main(argv: list[str] | None = None) -> None:
     elif args.parallel:
         run_parallel(claude, codex, goal, cwd)
     else:
-        run_goal(goal, cwd, claude, codex, plan_only=args.plan_only)
+        run_goal(goal, cwd, claude, codex, plan_only=args.plan_only, plan_cache=args.plan_cache)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+"""Plan template cache — reuse earlier plans for similar goals.
+
+Templates are stored in ~/.collab/plan_cache.db (SQLite) together with a
+bag-of-words vector of the goal. A lookup returns the most similar stored
+plan when its cosine similarity clears the threshold.
+"""
+from __future__ import annotations
+
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+CACHE_PATH = Path.home() / ".collab" / "plan_cache.db"
+SIMILARITY_THRESHOLD = 0.90
+MAX_TEMPLATES = 200  # oldest templates are dropped beyond this
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _vectorize(goal: str) -> Counter:
+    return Counter(_TOKEN_RE.findall(goal.lower()))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(n * b[t] for t, n in a.items() if t in b)
+    norm = math.sqrt(sum(n * n for n in a.values())) * math.sqrt(sum(n * n for n in b.values()))
+    return dot / norm
+
+
+def _connect() -> sqlite3.Connection:
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS plans ("
+        "goal TEXT, vector TEXT, plan_json TEXT, timestamp REAL)"
+    )
+    return conn
+
+
+def lookup(goal: str, threshold: float = SIMILARITY_THRESHOLD) -> Optional[tuple[float, str, dict]]:
+    """Return (similarity, cached_goal, plan) for the closest template, or None."""
+    vec = _vectorize(goal)
+    best: Optional[tuple[float, str, str]] = None
+    try:
+        with closing(_connect()) as conn:
+            rows = conn.execute("SELECT goal, vector, plan_json FROM plans").fetchall()
+        for cached_goal, vector, plan_json in rows:
+            sim = _cosine(vec, Counter(json.loads(vector)))
+            if sim >= threshold and (best is None or sim > best[0]):
+                best = (sim, cached_goal, plan_json)
+        if best is None:
+            return None
+        return best[0], best[1], json.loads(best[2])
+    except (sqlite3.Error, OSError, ValueError, TypeError):
+        return None  # a corrupt row is a miss, like an unreadable database
+
+
+def store(goal: str, plan: dict) -> None:
+    """Persist `plan` as a template for `goal`, keeping at most MAX_TEMPLATES."""
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO plans VALUES (?, ?, ?, ?)",
+                (goal, json.dumps(_vectorize(goal)), json.dumps(plan), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM plans WHERE rowid NOT IN "
+                "(SELECT rowid FROM plans ORDER BY timestamp DESC LIMIT ?)",
+                (MAX_TEMPLATES,),
+            )
+    except (sqlite3.Error, OSError):
+        pass  # the cache is best-effort; planning never fails because of it
@@ -1,11 +1,21 @@
 """Planner: uses Claude to decompose a development goal into subtasks."""
 from __future__ import annotations
 
+import atexit
+import codecs
 import json
+import os
 import re
+import select
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
+import time
+from typing import Optional
 
+from agent_collab import plan_cache
 from agent_collab.model_selector import select_model_for_task
 
 # ── System prompt: override project CLAUDE.md context ─────────────────────────
@@ -33,96 +43,375 @@ Example output format (use BOTH agents):
 
 Output ONLY valid JSON (no fences, no text before or after):"""
 
+_ADAPT_PROMPT = """\
+Adapt this existing plan to a new, closely related development goal.
+Keep the structure where it still fits; change titles, prompts, agents and dependencies where the new goal differs.
+
+Previous goal: {cached_goal}
+Previous plan: {plan_json}
+
+New goal: {goal}
+Working directory: {cwd}
+
+Output ONLY valid JSON in the same format (no fences, no text before or after):"""
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```")
+_BRACE_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+_DECODER = json.JSONDecoder()
+_STRUCT_RE = re.compile(r'[{}"\\]')
+_READ_CHUNK = 65536
+_REAP_TIMEOUT = 5  # seconds a terminated planner gets to exit before it is killed
+
+# Immutable per-task defaults filled in when the planner omits a field
+_TASK_DEFAULTS: tuple[tuple[str, object], ...] = (
+    ("agent", "claude"),
+    ("parallel", False),
+    ("prompt", ""),
+)
+
+# Neutral working dir shared by every planner call — no CLAUDE.md, no project context
+_NEUTRAL_CWD = tempfile.mkdtemp(prefix="agent_collab_planner_")
+atexit.register(shutil.rmtree, _NEUTRAL_CWD, ignore_errors=True)
+
 
 def _extract_json(text: str) -> str:
     """Extract JSON object from text, handling markdown fences and surrounding prose."""
     # 1. Try fenced code block first: ```json ... ``` or ``` ... ```
-    fenced = re.search(r"```(?:json)?\s*(\{[\s\S]*?\})\s*```", text)
+    fenced = _FENCE_RE.search(text)
     if fenced:
         return fenced.group(1)
     # 2. Find outermost { ... } spanning the whole response
     start = text.find("{")
     if start == -1:
         return ""
-    depth, end = 0, -1
-    for i, ch in enumerate(text[start:], start):
-        if ch == "{":
+    # Let the C-accelerated decoder find the object end — it is quote-aware,
+    # so braces inside string values (e.g. {"x": "}"}) don't end the scan early
+    try:
+        _, end = _DECODER.raw_decode(text, start)
+        return text[start:end]
+    except ValueError:
+        pass
+    # Fall back to a brace count for malformed objects; the regex engine
+    # skips string literals and plain text, so only real braces reach Python
+    depth = 0
+    for m in _BRACE_RE.finditer(text, start):
+        if m.group() == "{":
             depth += 1
-        elif ch == "}":
+        elif m.group() == "}":
             depth -= 1
             if depth == 0:
-                end = i
-                break
-    return text[start : end + 1] if end != -1 else ""
+                return text[start : m.end()]
+    return ""
 
 
-def _run_planner(goal: str, cwd: str) -> str:
-    """Call `claude --print` with a neutral (temp) working dir to avoid project context."""
-    import signal
+class _ObjectScanner:
+    """
+    Resumable, quote-aware brace counter fed with successive chunks of output.
+    Quotes are only tracked inside an object, so prose before the JSON can't
+    swallow the opening brace.
+    """
 
-    prompt = _PLAN_PROMPT.format(
-        goal=goal,
-        cwd=cwd,
-        goal_escaped=goal.replace('"', '\\"').replace("\n", " "),
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self._escape_pending = False  # chunk ended on a backslash inside a string
+
+    def feed(self, chunk: str) -> int:
+        """Return the offset just past the first object's closing brace, or -1."""
+        escaped_at = 0 if self._escape_pending else -1
+        self._escape_pending = False
+        for m in _STRUCT_RE.finditer(chunk):
+            i = m.start()
+            if i == escaped_at:
+                continue
+            ch = m.group()
+            if self.in_string:
+                if ch == "\\":
+                    if i + 1 == len(chunk):
+                        self._escape_pending = True
+                    escaped_at = i + 1
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.depth > 0
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if self.depth == 0:
+                    return m.end()
+        return -1
+
+
+def _planner_cmd(goal: str, cwd: str, prompt: Optional[str] = None) -> list[str]:
+    """Build the `claude --print` command line for a planning call."""
+    if prompt is None:
+        prompt = _PLAN_PROMPT.format(
+            goal=goal,
+            cwd=cwd,
+            goal_escaped=goal.replace('"', '\\"').replace("\n", " "),
+        )
+    return [
+        "claude", "--print",
+        "--system-prompt", _SYSTEM_PROMPT,
+        "--output-format", "text",
+        "--permission-mode", "bypassPermissions",
+        "--no-session-persistence",
+        prompt,
+    ]
+
+
+def _spawn_planner(goal: str, cwd: str, prompt: Optional[str] = None) -> subprocess.Popen:
+    """Start one planner process in the neutral working dir."""
+    return subprocess.Popen(
+        _planner_cmd(goal, cwd, prompt),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=0,  # raw pipe — _read_planner_output decodes chunks itself
+        close_fds=False,  # our fds are non-inheritable (PEP 446); skip the close sweep
+        cwd=_NEUTRAL_CWD,
     )
 
-    with tempfile.TemporaryDirectory() as tmpdir:
+
+def _read_planner_output(proc: subprocess.Popen, timeout: float = 120) -> str:
+    """
+    Stream planner stdout in raw chunks and stop the process as soon as the
+    first JSON object closes, instead of waiting for EOF. Raises TimeoutExpired.
+    """
+    fd = proc.stdout.fileno()
+    deadline = time.monotonic() + timeout
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    scanner = _ObjectScanner()
+    parts: list[str] = []
+    finished = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                proc.kill()
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue  # loop re-checks the deadline
+            data = os.read(fd, _READ_CHUNK)
+            text = decoder.decode(data, final=not data)
+            end = scanner.feed(text)
+            if end != -1:
+                parts.append(text[:end])
+                proc.terminate()
+                break
+            parts.append(text)
+            if not data:
+                break
+        finished = True
+    finally:
+        proc.stdout.close()
+        if not finished and proc.poll() is None:
+            # Interrupted (e.g. Ctrl-C) mid-stream: don't wait for the planner to finish
+            proc.kill()
         try:
-            proc = subprocess.run(
-                [
-                    "claude", "--print",
-                    "--system-prompt", _SYSTEM_PROMPT,
-                    "--output-format", "text",
-                    "--permission-mode", "bypassPermissions",
-                    "--no-session-persistence",
-                    prompt,
-                ],
-                capture_output=True,
-                text=True,
-                cwd=tmpdir,   # neutral dir — no CLAUDE.md, no project context
-                timeout=120,  # 2 minute timeout
-            )
-            return proc.stdout.strip()
-        except KeyboardInterrupt:
-            import sys
-            print("\n\n" + "\033[91m" + "✖ Planning cancelled by user (Ctrl+C)" + "\033[0m", file=sys.stderr)
-            raise
+            proc.wait(timeout=_REAP_TIMEOUT)
         except subprocess.TimeoutExpired:
-            import sys
-            print("\n\n" + "\033[91m" + "✖ Planning timed out (>2 minutes)" + "\033[0m", file=sys.stderr)
-            raise KeyboardInterrupt("Planning timeout")
+            proc.kill()  # ignored terminate()
+            proc.wait()
+    return "".join(parts)
+
+
+def _run_planner(goal: str, cwd: str, prompt: Optional[str] = None) -> str:
+    """Call `claude --print` with a neutral (temp) working dir to avoid project context."""
+    proc = _spawn_planner(goal, cwd, prompt)
+    try:
+        return _read_planner_output(proc, timeout=120).strip()  # 2 minute timeout
+    except KeyboardInterrupt:
+        proc.kill()
+        print("\n\n" + "\033[91m" + "✖ Planning cancelled by user (Ctrl+C)" + "\033[0m", file=sys.stderr)
+        raise
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        print("\n\n" + "\033[91m" + "✖ Planning timed out (>2 minutes)" + "\033[0m", file=sys.stderr)
+        raise KeyboardInterrupt("Planning timeout")
+
+
+def _run_planner_speculative(goal: str, cwd: str, n_attempts: int) -> dict:
+    """
+    Launch `n_attempts` planner calls at once and return the first plan that parses.
+    The remaining calls are killed as soon as a winner is found.
+    """
+    winner: dict = {}
+    errors: list[Exception] = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    pending = [n_attempts]  # workers still running, guarded by lock
+
+    procs = [_spawn_planner(goal, cwd) for _ in range(n_attempts)]
+
+    def _worker(attempt: int, proc: subprocess.Popen):
+        try:
+            plan = _parse_plan(_read_planner_output(proc, timeout=120).strip(), attempt)
+            with lock:
+                winner.setdefault("plan", plan)
+            done.set()
+        except Exception as e:  # any failure is re-raised by the caller if nothing wins
+            with lock:
+                errors.append(e)
+        finally:
+            with lock:
+                pending[0] -= 1
+                if not pending[0]:
+                    done.set()
+
+    threads = [
+        threading.Thread(target=_worker, args=(i + 1, p), daemon=True)
+        for i, p in enumerate(procs)
+    ]
+    for t in threads:
+        t.start()
+
+    try:
+        done.wait()
+    except KeyboardInterrupt:
+        print("\n\n" + "\033[91m" + "✖ Planning cancelled by user (Ctrl+C)" + "\033[0m", file=sys.stderr)
+        raise
+    finally:
+        for p in procs:
+            if p.poll() is None:
+                p.kill()
+
+    if "plan" in winner:
+        return winner["plan"]
+
+    unexpected = [e for e in errors if not isinstance(e, (ValueError, subprocess.TimeoutExpired))]
+    if unexpected:
+        raise unexpected[0]
+    parse_errors = [e for e in errors if isinstance(e, ValueError)]
+    if parse_errors:
+        raise parse_errors[-1]
+    print("\n\n" + "\033[91m" + "✖ Planning timed out (>2 minutes)" + "\033[0m", file=sys.stderr)
+    raise KeyboardInterrupt("Planning timeout")
+
+
+def _parse_plan(raw: str, attempt: int) -> dict:
+    """Extract and validate a plan from planner output. Raises ValueError on failure."""
+    json_str = _extract_json(raw)
+
+    if not json_str:
+        raise ValueError(
+            f"No JSON found in Claude output (attempt {attempt}):\n{raw[:400]}"
+        )
+
+    try:
+        plan = json.loads(json_str)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Invalid JSON from planner (attempt {attempt}):\n{e}\n\n{json_str[:400]}"
+        ) from None
+
+    if "tasks" not in plan or not isinstance(plan["tasks"], list):
+        raise ValueError(f"Plan missing 'tasks' list (attempt {attempt}):\n{plan}")
+
+    return plan
 
 
 def _auto_detect_parallel_tasks(tasks: list) -> None:
     """
     Automatically mark tasks as parallel if they can run concurrently.
-    Tasks are parallelizable if they:
-    1. Have no dependencies on each other
-    2. Only depend on already-completed tasks (earlier IDs)
+    Each task gets a topological level (longest dependency chain from a root);
+    tasks sharing a level have no path between them, so any level holding two
+    or more tasks runs in parallel. Computed in O(V+E) with Kahn's algorithm.
     """
-    # Build dependency map
-    task_ids = [t["id"] for t in tasks]
+    by_id = {t["id"]: t for t in tasks}
+    preds: dict = {tid: [d for d in t.get("depends_on", []) if d in by_id] for tid, t in by_id.items()}
+    succ: dict = {tid: [] for tid in by_id}
+    for tid, deps in preds.items():
+        for d in deps:
+            succ[d].append(tid)
+
+    indegree = {tid: len(deps) for tid, deps in preds.items()}
+    level = {tid: 0 for tid, n in indegree.items() if n == 0}
+    queue = list(level)
+    for tid in queue:  # queue grows while iterating — Kahn's order
+        for nxt in succ[tid]:
+            level[nxt] = max(level.get(nxt, 0), level[tid] + 1)
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
 
-    # Group tasks by their maximum dependency ID
-    # Tasks with the same max_dep can potentially run in parallel
+    # Group by level; only queued tasks count, so anything caught in or behind
+    # a dependency cycle (partial level, never reaches indegree 0) is left out
     groups: dict[int, list] = {}
-    for t in tasks:
-        deps = t.get("depends_on", [])
-        max_dep = max(deps) if deps else 0
-        if max_dep not in groups:
-            groups[max_dep] = []
-        groups[max_dep].append(t)
-
-    # Mark tasks as parallel if there are multiple tasks in the same group
-    for max_dep, group_tasks in groups.items():
+    for tid in queue:
+        groups.setdefault(level[tid], []).append(by_id[tid])
+
+    for group_tasks in groups.values():
         if len(group_tasks) >= 2:
-            # Multiple tasks with same dependencies can run in parallel
             for t in group_tasks:
                 t["parallel"] = True
 
 
-def generate_plan(goal: str, cwd: str = ".", max_retries: int = 2, auto_parallel: bool = True) -> dict:
-    """Call Claude to decompose `goal` into a structured plan. Retries on parse failure."""
+def generate_plan(
+    goal: str,
+    cwd: str = ".",
+    max_retries: int = 2,
+    auto_parallel: bool = True,
+    speculative: bool = False,
+    use_cache: bool = False,
+) -> dict:
+    """
+    Call Claude to decompose `goal` into a structured plan. Retries on parse failure.
+
+    With `speculative=True` all `max_retries + 1` attempts run concurrently and the
+    first one that parses wins — lower latency at the price of extra API calls.
+    With `use_cache=True` a stored plan for a similar goal is adapted with a short
+    prompt instead of planning from scratch, and new plans are stored as templates.
+    """
+    plan = None
+    if use_cache:
+        plan = _adapt_cached_plan(goal, cwd)
+
+    if plan is None:
+        plan = _plan_from_scratch(goal, cwd, max_retries, speculative)
+
+    if use_cache:
+        plan_cache.store(goal, plan)
+    return _finalize_plan(plan, auto_parallel)
+
+
+def _adapt_cached_plan(goal: str, cwd: str) -> Optional[dict]:
+    """Adapt the closest cached plan to `goal`; None on a cache miss or a bad reply."""
+    hit = plan_cache.lookup(goal)
+    if hit is None:
+        return None
+    sim, cached_goal, cached_plan = hit
+    print(f"  planner: cache hit sim={sim:.2f}", file=sys.stderr)
+
+    prompt = _ADAPT_PROMPT.format(
+        cached_goal=cached_goal,
+        plan_json=json.dumps(cached_plan, separators=(",", ":")),
+        goal=goal,
+        cwd=cwd,
+    )
+    try:
+        # Read directly rather than via _run_planner, which reports a timeout as
+        # KeyboardInterrupt: a slow or broken adapt call falls back instead of aborting
+        raw = _read_planner_output(_spawn_planner(goal, cwd, prompt), timeout=120).strip()
+        return _parse_plan(raw, 1)
+    except KeyboardInterrupt:
+        print("\n  \033[93mPlanning cancelled. Returning to prompt.\033[0m\n", file=sys.stderr)
+        raise
+    except (ValueError, subprocess.TimeoutExpired, OSError, RuntimeError):
+        return None  # fall back to planning from scratch
+
+
+def _plan_from_scratch(goal: str, cwd: str, max_retries: int, speculative: bool) -> dict:
+    """Run the full planning prompt, serially with retries or speculatively."""
+    if speculative:
+        try:
+            return _run_planner_speculative(goal, cwd, max_retries + 1)
+        except KeyboardInterrupt:
+            print("\n  \033[93mPlanning cancelled. Returning to prompt.\033[0m\n", file=sys.stderr)
+            raise
+
     last_error = None
 
     for attempt in range(1, max_retries + 2):  # attempts = max_retries + 1
@@ -130,57 +419,46 @@ def generate_plan(goal: str, cwd: str = ".", max_retries: int = 2, auto_parallel
             raw = _run_planner(goal, cwd)
         except KeyboardInterrupt:
             # User cancelled - exit cleanly
-            import sys
             print("\n  \033[93mPlanning cancelled. Returning to prompt.\033[0m\n", file=sys.stderr)
             raise
-        json_str = _extract_json(raw)
-
-        if not json_str:
-            last_error = ValueError(
-                f"No JSON found in Claude output (attempt {attempt}):\n{raw[:400]}"
-            )
-            continue
 
         try:
-            plan = json.loads(json_str)
-        except json.JSONDecodeError as e:
-            last_error = ValueError(
-                f"Invalid JSON from planner (attempt {attempt}):\n{e}\n\n{json_str[:400]}"
-            )
-            continue
-
-        if "tasks" not in plan or not isinstance(plan["tasks"], list):
-            last_error = ValueError(f"Plan missing 'tasks' list (attempt {attempt}):\n{plan}")
-            continue
-
-        # Success — normalise fields
-        for i, t in enumerate(plan["tasks"]):
-            t.setdefault("id", i + 1)
-            t.setdefault("title", f"Task {i + 1}")
-            t.setdefault("agent", "claude")
-            t.setdefault("depends_on", [])
-            t.setdefault("parallel", False)
-            t.setdefault("prompt", "")
-            # Auto-select appropriate model based on task complexity
-            t["model"] = select_model_for_task(t)
-
-        # Auto-detect parallel tasks if enabled
-        if auto_parallel:
-            _auto_detect_parallel_tasks(plan["tasks"])
-            parallel_count = sum(1 for t in plan["tasks"] if t.get("parallel"))
-            if parallel_count > 0:
-                import sys
-                print(f"  ⚡ {parallel_count} task(s) will run in parallel for faster execution", file=sys.stderr)
-
-        # Warn if all tasks assigned to same agent
-        agents = [t["agent"] for t in plan["tasks"]]
-        if len(set(agents)) == 1 and len(agents) > 1:
-            import sys
-            dominant = agents[0]
-            print(f"\n⚠️  Warning: All {len(agents)} tasks assigned to {dominant.upper()}.", file=sys.stderr)
-            print(f"   Consider reassigning some tasks in the plan editor.", file=sys.stderr)
-            print(f"   Use 'r <task_id> codex' or 'r <task_id> claude'\n", file=sys.stderr)
-
-        return plan
+            return _parse_plan(raw, attempt)
+        except ValueError as e:
+            last_error = e
 
     raise last_error  # all attempts failed
+
+
+def _finalize_plan(plan: dict, auto_parallel: bool) -> dict:
+    """Normalise task fields, detect parallel tasks and warn on one-sided agent assignment."""
+    # Normalise fields
+    for i, t in enumerate(plan["tasks"]):
+        if "id" not in t:
+            t["id"] = i + 1
+        if "title" not in t:  # only format the fallback title when needed
+            t["title"] = f"Task {i + 1}"
+        if "depends_on" not in t:
+            t["depends_on"] = []  # fresh list per task, never a shared default
+        for key, default in _TASK_DEFAULTS:
+            if key not in t:
+                t[key] = default
+        # Auto-select appropriate model based on task complexity
+        t["model"] = select_model_for_task(t)
+
+    # Auto-detect parallel tasks if enabled
+    if auto_parallel:
+        _auto_detect_parallel_tasks(plan["tasks"])
+        parallel_count = sum(1 for t in plan["tasks"] if t.get("parallel"))
+        if parallel_count > 0:
+            print(f"  ⚡ {parallel_count} task(s) will run in parallel for faster execution", file=sys.stderr)
+
+    # Warn if all tasks assigned to same agent
+    agents = [t["agent"] for t in plan["tasks"]]
+    if len(set(agents)) == 1 and len(agents) > 1:
+        dominant = agents[0]
+        print(f"\n⚠️  Warning: All {len(agents)} tasks assigned to {dominant.upper()}.", file=sys.stderr)
+        print(f"   Consider reassigning some tasks in the plan editor.", file=sys.stderr)
+        print(f"   Use 'r <task_id> codex' or 'r <task_id> claude'\n", file=sys.stderr)
+
+    return plan
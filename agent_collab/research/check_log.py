@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """Utility to check experiment logs - quick summary or full tail."""
 import argparse
+import errno
+import io
+import os
+import shutil
 import sys
 from pathlib import Path
 
@@ -10,6 +14,34 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from agent_collab.research.monitor import show_log_tail, print_log_summary
 
 
+def _stream_file(path: Path) -> None:
+    """Copy a file to stdout without holding it in memory (zero-copy on Linux)."""
+    sys.stdout.flush()
+    try:
+        out_fd = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        out_fd = None  # stdout replaced by an in-memory stream
+
+    with open(path, "rb") as f:
+        offset = 0
+        if out_fd is not None and hasattr(os, "sendfile"):
+            size = os.fstat(f.fileno()).st_size
+            try:
+                while offset < size:
+                    sent = os.sendfile(out_fd, f.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.ENOSYS):
+                    raise
+        # Buffered fallback: still streams in fixed-size chunks
+        f.seek(offset)
+        shutil.copyfileobj(f, sys.stdout.buffer, io.DEFAULT_BUFFER_SIZE)
+        sys.stdout.buffer.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Check experiment log files",
@@ -60,9 +92,7 @@ Examples:
     if args.full:
         # Show all lines
         try:
-            with open(log_path, "r") as f:
-                content = f.read()
-            print(content)
+            _stream_file(log_path)
         except Exception as e:
             print(f"Error reading log: {e}")
             sys.exit(1)
@@ -1,10 +1,27 @@
 """Terminal display for AI Research Mode."""
 from __future__ import annotations
 
+import os
 import sys
 from agent_collab.research.state import RoundResult, StepResult
 
-_USE_COLOR = sys.stdout.isatty()
+
+def _color_default() -> bool:
+    """NO_COLOR disables styling, CLICOLOR_FORCE forces it; otherwise follow the TTY."""
+    if os.environ.get("NO_COLOR"):
+        return False
+    if os.environ.get("CLICOLOR_FORCE", "0") != "0":
+        return True
+    return sys.stdout.isatty()
+
+
+_USE_COLOR = _color_default()
+
+
+def set_color(enabled: bool) -> None:
+    """Turn ANSI styling on or off, e.g. after stdout was redirected post-import."""
+    global _USE_COLOR
+    _USE_COLOR = enabled
 
 STEP_META = [
     (1, "understand",  "Goal Understanding",          "claude",        "cyan"),
@@ -16,28 +33,56 @@ STEP_META = [
 ]
 
 
+_CODES = {
+    "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
+    "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
+    "red": "\033[91m",  "magenta": "\033[95m",
+}
+_RESET = _CODES["reset"]
+
+
+_PREFIX: dict[tuple[str, ...], str] = {}
+
+
+def _style_prefix(styles: tuple[str, ...]) -> str:
+    prefix = _PREFIX[styles] = "".join(_CODES.get(s, "") for s in styles)
+    return prefix
+
+
+# Pre-render every style combination this module uses; others are added on first use
+for _styles in (
+    ("bold",), ("dim",), ("magenta",), ("magenta", "bold"), ("green",),
+    ("green", "bold"), ("yellow",), ("red", "bold"),
+    *((meta[4],) for meta in STEP_META), *((meta[4], "bold") for meta in STEP_META),
+):
+    _style_prefix(_styles)
+
+
 def _c(text: str, *styles: str) -> str:
     if not _USE_COLOR:
         return text
-    codes = {
-        "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
-        "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
-        "red": "\033[91m",  "magenta": "\033[95m",
-    }
-    return "".join(codes.get(s, "") for s in styles) + text + codes["reset"]
+    prefix = _PREFIX.get(styles)
+    if prefix is None:
+        prefix = _style_prefix(styles)
+    return prefix + text + _RESET
+
+
+def _emit(parts: list[str]) -> None:
+    """Write a block of lines with a single stdout write."""
+    sys.stdout.write("\n".join(parts) + "\n")
 
 
 def print_session_header(goal: str, total_rounds: int, interactive: bool = False) -> None:
     import textwrap
     w = 72
-    print()
-    print(_c("╔" + "═" * (w - 2) + "╗", "magenta", "bold"))
+    parts = [""]
+    parts.append(_c("╔" + "═" * (w - 2) + "╗", "magenta", "bold"))
 
     # Title line with round count
     mode_str = " [INTERACTIVE]" if interactive else ""
     title = f"  AI RESEARCH MODE — {total_rounds} Round(s){mode_str}"
     padding = w - 2 - len(f"  AI RESEARCH MODE — {total_rounds} Round(s){mode_str}")
-    print(_c("║", "magenta") + _c(title, "bold") + " " * padding + _c("║", "magenta"))
+    parts.append(_c("║", "magenta") + _c(title, "bold") + " " * padding + _c("║", "magenta"))
 
     # Wrap long goal text
     goal_prefix = "  Goal: "
@@ -45,32 +90,36 @@ def print_session_header(goal: str, total_rounds: int, interactive: bool = False
     if len(goal) <= goal_width - len(goal_prefix):
         # Short goal - single line
         goal_line = goal_prefix + goal
-        print(_c("║", "magenta") + goal_line.ljust(w - 2) + _c("║", "magenta"))
+        parts.append(_c("║", "magenta") + goal_line.ljust(w - 2) + _c("║", "magenta"))
     else:
         # Long goal - wrap into multiple lines
         wrapped = textwrap.wrap(goal, width=goal_width - len(goal_prefix))
         # First line with prefix
         first_line = goal_prefix + wrapped[0]
-        print(_c("║", "magenta") + first_line.ljust(w - 2) + _c("║", "magenta"))
+        parts.append(_c("║", "magenta") + first_line.ljust(w - 2) + _c("║", "magenta"))
         # Remaining lines with indent
         for line in wrapped[1:]:
             indented = "        " + line  # 8 spaces to align with "Goal: "
-            print(_c("║", "magenta") + indented.ljust(w - 2) + _c("║", "magenta"))
+            parts.append(_c("║", "magenta") + indented.ljust(w - 2) + _c("║", "magenta"))
 
-    print(_c("╚" + "═" * (w - 2) + "╝", "magenta", "bold"))
-    print()
+    parts.append(_c("╚" + "═" * (w - 2) + "╝", "magenta", "bold"))
+    parts.append("")
+    _emit(parts)
 
 
 def print_round_header(round_num: int, total_rounds: int) -> None:
     bar = "─" * 60
-    print()
-    print(_c(bar, "magenta"))
-    print(_c(f"  ROUND {round_num}/{total_rounds}", "magenta", "bold"))
-    print(_c(bar, "magenta"))
-    print()
+    parts = [
+        "",
+        _c(bar, "magenta"),
+        _c(f"  ROUND {round_num}/{total_rounds}", "magenta", "bold"),
+        _c(bar, "magenta"),
+        "",
+    ]
     for sid, key, name, agents, color in STEP_META:
-        print(f"  {_c(f'Step {sid}/6', 'dim')}  {_c(name, color):40}  {_c(agents, 'dim')}")
-    print()
+        parts.append(f"  {_c(f'Step {sid}/6', 'dim')}  {_c(name, color):40}  {_c(agents, 'dim')}")
+    parts.append("")
+    _emit(parts)
 
 
 def print_step_start(step_id: int, step_name: str, n_agents: int) -> None:
@@ -81,19 +130,28 @@ def print_step_start(step_id: int, step_name: str, n_agents: int) -> None:
 
 
 _PREVIEW_LINES = 20
+_PREVIEW_WIDTH = 120
+
+
+def _append_preview(parts: list[str], lines: list[str]) -> None:
+    """Append indented preview lines, truncating long ones with a dim ellipsis."""
+    suffix = _c(" …", "dim")  # rendered once per block, not per line
+    for line in lines:
+        parts.append("  " + line[:_PREVIEW_WIDTH] + (suffix if len(line) > _PREVIEW_WIDTH else ""))
 
 
 def print_step_result(step: StepResult) -> None:
     out = step.primary_output().strip()
     _, _, _, _, color = STEP_META[step.step_id - 1]
-    agents_used = ", ".join(sorted({o.agent for o in step.outputs}))
+    agents_used = ", ".join(sorted(dict.fromkeys(o.agent for o in step.outputs)))
     t_str = _c(f"{step.duration_s:.1f}s", "dim")
 
     # ── Step completion header ────────────────────────────────────────────────
-    print(_c(f"\n  ✓  {step.step_name}", color, "bold") +
-          f"  {t_str}  " + _c(f"[{agents_used}]", "dim"))
+    parts = [_c(f"\n  ✓  {step.step_name}", color, "bold") +
+             f"  {t_str}  " + _c(f"[{agents_used}]", "dim")]
 
     if not out:
+        _emit(parts)
         return
 
     lines = out.splitlines()
@@ -101,53 +159,57 @@ def print_step_result(step: StepResult) -> None:
     hidden  = len(lines) - _PREVIEW_LINES
 
     # ── Content preview ───────────────────────────────────────────────────────
-    print(_c("  ┄" * 30, "dim"))
-    for line in preview:
-        display = line[:120] + _c(" …", "dim") if len(line) > 120 else line
-        print(f"  {display}")
+    parts.append(_c("  ┄" * 30, "dim"))
+    _append_preview(parts, preview)
     if hidden > 0:
-        print(_c(f"  ╌╌ +{hidden} more lines (saved to report) ╌╌", "dim"))
-    print()
+        parts.append(_c(f"  ╌╌ +{hidden} more lines (saved to report) ╌╌", "dim"))
+    parts.append("")
 
     # ── Critic output (if present) ────────────────────────────────────────────
     critic_out = next((o for o in step.outputs if o.role == "critic"), None)
     if critic_out and critic_out.output.strip():
-        print(_c("  ⚠  Critic [CLAUDE]", "red", "bold") +
-              _c(f"  {critic_out.duration_s:.1f}s", "dim"))
-        print(_c("  ┄" * 30, "dim"))
+        parts.append(_c("  ⚠  Critic [CLAUDE]", "red", "bold") +
+                     _c(f"  {critic_out.duration_s:.1f}s", "dim"))
+        parts.append(_c("  ┄" * 30, "dim"))
         clines = critic_out.output.strip().splitlines()
-        for line in clines[:_PREVIEW_LINES]:
-            display = line[:120] + _c(" …", "dim") if len(line) > 120 else line
-            print(f"  {display}")
+        _append_preview(parts, clines[:_PREVIEW_LINES])
         if len(clines) > _PREVIEW_LINES:
-            print(_c(f"  ╌╌ +{len(clines) - _PREVIEW_LINES} more lines (saved to report) ╌╌", "dim"))
-        print()
+            parts.append(_c(f"  ╌╌ +{len(clines) - _PREVIEW_LINES} more lines (saved to report) ╌╌", "dim"))
+        parts.append("")
+
+    _emit(parts)
 
 
 def print_round_summary(rr: RoundResult) -> None:
     total_t = sum(s.duration_s for s in rr.steps.values())
-    print()
-    print(_c("  ━" * 35, "magenta"))
-    print(_c(f"  ROUND {rr.round_num} COMPLETE", "magenta", "bold") +
-          _c(f"  ({total_t:.0f}s total)", "dim"))
+    parts = [
+        "",
+        _c("  ━" * 35, "magenta"),
+        _c(f"  ROUND {rr.round_num} COMPLETE", "magenta", "bold") +
+        _c(f"  ({total_t:.0f}s total)", "dim"),
+    ]
     if rr.best_metric:
-        print(_c(f"  ★ Best:  {rr.best_metric}", "green", "bold"))
+        parts.append(_c(f"  ★ Best:  {rr.best_metric}", "green", "bold"))
     if rr.next_hypotheses:
-        print(_c("  → Next round hypotheses:", "yellow"))
+        parts.append(_c("  → Next round hypotheses:", "yellow"))
         for h in rr.next_hypotheses[:4]:
             # Trim long hypotheses
             h_display = h[:100] + "…" if len(h) > 100 else h
-            print(f"    • {h_display}")
-    print(_c("  ━" * 35, "magenta"))
-    print()
+            parts.append(f"    • {h_display}")
+    parts.append(_c("  ━" * 35, "magenta"))
+    parts.append("")
+    _emit(parts)
 
 
 def print_final_summary(state) -> None:
-    print(_c("\n╔══════════════════════════════════════════════════╗", "magenta", "bold"))
-    print(_c("║  RESEARCH SESSION COMPLETE                        ║", "magenta", "bold"))
-    print(_c("╚══════════════════════════════════════════════════╝", "magenta", "bold"))
-    print(f"\nGoal: {state.goal}\nRounds: {len(state.rounds)}\n")
+    parts = [
+        _c("\n╔══════════════════════════════════════════════════╗", "magenta", "bold"),
+        _c("║  RESEARCH SESSION COMPLETE                        ║", "magenta", "bold"),
+        _c("╚══════════════════════════════════════════════════╝", "magenta", "bold"),
+        f"\nGoal: {state.goal}\nRounds: {len(state.rounds)}\n",
+    ]
     for rr in state.rounds:
         metric = _c(rr.best_metric or "—", "green")
-        print(f"  Round {rr.round_num}: {metric}")
-    print()
+        parts.append(f"  Round {rr.round_num}: {metric}")
+    parts.append("")
+    _emit(parts)
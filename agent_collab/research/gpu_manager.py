@@ -1,11 +1,25 @@
 """GPU management for parallel experiment execution."""
 from __future__ import annotations
 
+import atexit
+import csv
+import heapq
+import io
+import math
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Optional
 
+try:
+    import pynvml  # optional: nvidia-ml-py
+except ImportError:
+    pynvml = None
+
 
 @dataclass
 class GPUInfo:
@@ -25,7 +39,7 @@ class GPUInfo:
         return f"GPU {self.index}: {self.name} ({self.memory_free_gb:.1f}GB free)"
 
 
-def detect_gpus() -> list[GPUInfo]:
+def _detect_gpus_smi() -> list[GPUInfo]:
     """Detect available GPUs using nvidia-smi."""
     try:
         result = subprocess.run(
@@ -43,19 +57,9 @@ def detect_gpus() -> list[GPUInfo]:
             return []
 
         gpus = []
-        for line in result.stdout.strip().split('\n'):
-            if not line.strip():
-                continue
-            parts = [p.strip() for p in line.split(',')]
-            if len(parts) >= 6:
-                gpus.append(GPUInfo(
-                    index=int(parts[0]),
-                    name=parts[1],
-                    memory_total=int(parts[2]),
-                    memory_used=int(parts[3]),
-                    memory_free=int(parts[4]),
-                    utilization=int(parts[5])
-                ))
+        for row in csv.reader(io.StringIO(result.stdout), skipinitialspace=True):
+            if len(row) >= 6:
+                gpus.append(GPUInfo(int(row[0]), row[1].strip(), *map(int, row[2:6])))
 
         return gpus
 
@@ -63,6 +67,122 @@ def detect_gpus() -> list[GPUInfo]:
         return []
 
 
+# Process-lifetime NVML session: device handles are looked up once at init
+_NVML_LOCK = threading.Lock()
+_NVML_HANDLES: Optional[list] = None  # None = not tried yet, [] = unavailable
+
+
+def _nvml_handles() -> list:
+    """Initialise NVML on first use; return device handles ([] if NVML is unusable)."""
+    global _NVML_HANDLES
+    if _NVML_HANDLES is not None:
+        return _NVML_HANDLES
+    with _NVML_LOCK:
+        if _NVML_HANDLES is None:
+            handles = []
+            if pynvml is not None:
+                try:
+                    pynvml.nvmlInit()
+                    handles = [
+                        pynvml.nvmlDeviceGetHandleByIndex(i)
+                        for i in range(pynvml.nvmlDeviceGetCount())
+                    ]
+                    atexit.register(pynvml.nvmlShutdown)
+                except pynvml.NVMLError:
+                    handles = []
+            _NVML_HANDLES = handles
+    return _NVML_HANDLES
+
+
+def _nvml_query_one(index: int, handle) -> GPUInfo:
+    """Build one GPUInfo straight from NVML structs (no process spawn, no text parsing)."""
+    mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+    name = pynvml.nvmlDeviceGetName(handle)
+    if isinstance(name, bytes):  # older pynvml returns bytes
+        name = name.decode()
+    return GPUInfo(
+        index=index,
+        name=name,
+        memory_total=mem.total >> 20,
+        memory_used=mem.used >> 20,
+        memory_free=mem.free >> 20,
+        utilization=pynvml.nvmlDeviceGetUtilizationRates(handle).gpu,
+    )
+
+
+def _detect_gpus_nvml(handles: list) -> list[GPUInfo]:
+    """Query every device; NVML releases the GIL, so larger nodes are queried concurrently."""
+    if len(handles) <= 2:
+        return [_nvml_query_one(i, h) for i, h in enumerate(handles)]
+    with ThreadPoolExecutor(max_workers=min(8, len(handles))) as pool:
+        return list(pool.map(_nvml_query_one, range(len(handles)), handles))
+
+
+def _query_gpus() -> list[GPUInfo]:
+    """Query GPUs via NVML, falling back to nvidia-smi."""
+    handles = _nvml_handles()
+    if handles:
+        try:
+            return _detect_gpus_nvml(handles)
+        except pynvml.NVMLError:
+            pass
+    return _detect_gpus_smi()
+
+
+def _poll_interval() -> float:
+    """Cache TTL in seconds from AGENT_COLLAB_GPU_POLL_SEC (default 0.5, clamped to 0-120)."""
+    try:
+        ttl = float(os.environ.get("AGENT_COLLAB_GPU_POLL_SEC", "0.5"))
+    except ValueError:
+        return 0.5
+    return min(max(ttl, 0.0), 120.0)
+
+
+_TTL = _poll_interval()
+_cache_lock = threading.Lock()
+_cache: dict = {"t": 0.0, "v": None}
+
+
+def detect_gpus() -> list[GPUInfo]:
+    """
+    Detect available GPUs. Results are reused for _TTL seconds so back-to-back
+    callers (status, selection, allocation) share one driver query.
+    """
+    with _cache_lock:
+        now = time.monotonic()
+        if _cache["v"] is None or now - _cache["t"] >= _TTL:
+            _cache["v"] = _query_gpus()
+            _cache["t"] = now
+        return list(_cache["v"])
+
+
+def invalidate_gpu_cache() -> None:
+    """Force the next detect_gpus() call to query the driver (e.g. right after a launch)."""
+    with _cache_lock:
+        _cache["v"] = None
+
+
+def _eligible_gpus(
+    gpus: list[GPUInfo],
+    required_memory_gb: Optional[float] = None,
+    max_utilization: int = 30
+) -> list[GPUInfo]:
+    """Filter GPUs by free memory and utilization."""
+    available = []
+    for gpu in gpus:
+        # Check memory requirement
+        if required_memory_gb and gpu.memory_free_gb < required_memory_gb:
+            continue
+
+        # Check utilization
+        if gpu.utilization > max_utilization:
+            continue
+
+        available.append(gpu)
+
+    return available
+
+
 def select_available_gpus(
     required_memory_gb: Optional[float] = None,
     max_utilization: int = 30
@@ -77,28 +197,69 @@ def select_available_gpus(
     Returns:
         List of GPU indices that meet the criteria
     """
-    gpus = detect_gpus()
-    if not gpus:
-        return []
+    return [gpu.index for gpu in _eligible_gpus(detect_gpus(), required_memory_gb, max_utilization)]
 
-    available = []
-    for gpu in gpus:
-        # Check memory requirement
-        if required_memory_gb and gpu.memory_free_gb < required_memory_gb:
-            continue
 
-        # Check utilization
-        if gpu.utilization > max_utilization:
-            continue
+# Greedy balancing: a GPU's load is its utilization (%) plus _MEMORY_WEIGHT times
+# the fraction of memory in use; each assigned experiment adds _JOB_LOAD.
+_MEMORY_WEIGHT = 100.0
+_JOB_LOAD = 100.0
 
-        available.append(gpu.index)
 
-    return available
+def _gpu_load(gpu: GPUInfo) -> float:
+    used = gpu.memory_used / gpu.memory_total if gpu.memory_total else 0.0
+    return gpu.utilization + _MEMORY_WEIGHT * used
+
+
+def _job_load(gpus_per_experiment: float) -> float:
+    return _JOB_LOAD * min(gpus_per_experiment, 1.0)
+
+
+def _assign(
+    gpus: list[GPUInfo],
+    n_experiments: int,
+    initial_load,
+    gpus_per_experiment: float,
+    max_per_gpu: Optional[int],
+    occupied: Optional[dict[int, int]] = None,
+) -> dict[int, list[int]]:
+    """
+    Give each experiment the currently least-loaded GPU(s) from a min-heap.
+    A GPU leaves the pool once it holds max_per_gpu experiments; experiments
+    that find fewer GPUs left in the pool than they need get [] (no pinning)
+    rather than a partial set. `occupied` counts experiments already placed on
+    each GPU towards max_per_gpu; their load is left to `initial_load`.
+    """
+    width = math.ceil(gpus_per_experiment)
+    job_load = _job_load(gpus_per_experiment)
+    occupied = occupied or {}
+    counts = {gpu.index: occupied.get(gpu.index, 0) for gpu in gpus}
+    heap = [
+        (initial_load(gpu), gpu.index)
+        for gpu in gpus
+        if max_per_gpu is None or counts[gpu.index] < max_per_gpu
+    ]
+    heapq.heapify(heap)
+    allocation = {}
+    for i in range(n_experiments):
+        if len(heap) < width:
+            allocation[i] = []
+            continue
+        taken = [heapq.heappop(heap) for _ in range(width)]
+        allocation[i] = sorted(gpu_idx for _, gpu_idx in taken)
+        for load, gpu_idx in taken:
+            counts[gpu_idx] += 1
+            if max_per_gpu is None or counts[gpu_idx] < max_per_gpu:
+                heapq.heappush(heap, (load + job_load, gpu_idx))
+    return allocation
 
 
 def allocate_gpus_to_experiments(
     n_experiments: int,
-    required_memory_gb: Optional[float] = None
+    required_memory_gb: Optional[float] = None,
+    balance: str = "greedy",
+    gpus_per_experiment: float = 1.0,
+    max_experiments_per_gpu: Optional[int] = None
 ) -> dict[int, list[int]]:
     """
     Allocate GPUs to experiments for parallel execution.
@@ -106,31 +267,134 @@ def allocate_gpus_to_experiments(
     Args:
         n_experiments: Number of experiments to run
         required_memory_gb: Memory requirement per experiment
+        balance: "greedy" (least-loaded GPU first) or "roundrobin"
+        gpus_per_experiment: GPUs each experiment needs; values above 1 are rounded
+            up to that many devices, fractions pack floor(1/x) experiments per GPU
+        max_experiments_per_gpu: Hard cap on experiments sharing one GPU
+            (defaults to floor(1/x) for fractional requests, otherwise unlimited)
 
     Returns:
         Dict mapping experiment index to list of GPU indices
-        Example: {0: [0], 1: [1], 2: [0, 1]} for 3 experiments on 2 GPUs
+        Example: {0: [0], 1: [1], 2: [0, 1]} for 3 experiments on 2 GPUs.
+        Experiments left over once too few GPUs are below their cap map to [].
+
+    Raises:
+        ValueError: if an experiment needs more GPUs than the machine has
     """
-    available_gpus = select_available_gpus(required_memory_gb)
+    if balance not in ("greedy", "roundrobin"):
+        raise ValueError(f"Unknown balance strategy: {balance!r}")
+    if gpus_per_experiment <= 0:
+        raise ValueError("gpus_per_experiment must be positive")
+
+    gpus = detect_gpus()
+    if gpus and math.ceil(gpus_per_experiment) > len(gpus):
+        raise ValueError(
+            f"gpus_per_experiment={gpus_per_experiment} needs more GPUs than the {len(gpus)} detected"
+        )
+    available_gpus = _eligible_gpus(gpus, required_memory_gb)
 
     if not available_gpus:
         # No GPUs available or detected, return empty allocation
         # Experiments will run on CPU or default GPU
         return {i: [] for i in range(n_experiments)}
 
-    allocation = {}
+    return _assign(available_gpus, n_experiments, _initial_load(balance),
+                   gpus_per_experiment,
+                   _slot_cap(gpus_per_experiment, max_experiments_per_gpu))
 
-    if len(available_gpus) >= n_experiments:
-        # One GPU per experiment (best case)
-        for i in range(n_experiments):
-            allocation[i] = [available_gpus[i]]
-    else:
-        # Distribute experiments across available GPUs
-        for i in range(n_experiments):
-            gpu_idx = available_gpus[i % len(available_gpus)]
-            allocation[i] = [gpu_idx]
 
-    return allocation
+def _slot_cap(gpus_per_experiment: float, max_experiments_per_gpu: Optional[int]) -> Optional[int]:
+    if max_experiments_per_gpu is None and gpus_per_experiment < 1:
+        return math.floor(1 / gpus_per_experiment)
+    return max_experiments_per_gpu
+
+
+def _initial_load(balance: str):
+    # Round-robin is the same heap with every GPU starting at zero load
+    return _gpu_load if balance == "greedy" else (lambda gpu: 0.0)
+
+
+class GPUAllocator:
+    """
+    Holds an experiment → GPU allocation for a long batch and periodically
+    re-assigns experiments that have not started yet, so new work avoids GPUs
+    that other jobs have since loaded up.
+    """
+
+    def __init__(
+        self,
+        required_memory_gb: Optional[float] = None,
+        balance: str = "greedy",
+        gpus_per_experiment: float = 1.0,
+        max_experiments_per_gpu: Optional[int] = None,
+        rebalance_interval: float = 30.0
+    ):
+        self.required_memory_gb = required_memory_gb
+        self.balance = balance
+        self.gpus_per_experiment = gpus_per_experiment
+        self.max_experiments_per_gpu = max_experiments_per_gpu
+        self.rebalance_interval = rebalance_interval
+        self.allocation: dict[int, list[int]] = {}
+        self.last_rebalance = time.monotonic()
+
+    def allocate(self, n_experiments: int) -> dict[int, list[int]]:
+        """Initial allocation for experiments 0..n_experiments-1."""
+        self.allocation = allocate_gpus_to_experiments(
+            n_experiments, self.required_memory_gb, self.balance,
+            self.gpus_per_experiment, self.max_experiments_per_gpu,
+        )
+        self.last_rebalance = time.monotonic()
+        return dict(self.allocation)
+
+    def rebalance(self, pending_experiments: list[int], force: bool = False) -> dict[int, list[int]]:
+        """
+        Re-assign the pending experiments against a fresh GPU reading, counting
+        the experiments already started as occupying their GPUs.
+        Runs at most once per rebalance_interval unless force=True.
+
+        Returns:
+            Dict of experiments whose GPUs changed, mapped to their new GPUs
+        """
+        now = time.monotonic()
+        if not pending_experiments or (not force and now - self.last_rebalance < self.rebalance_interval):
+            return {}
+        self.last_rebalance = now
+        invalidate_gpu_cache()
+        pending = set(pending_experiments)
+        occupied: dict[int, int] = {}
+        for exp_idx, gpu_ids in self.allocation.items():
+            if exp_idx not in pending:
+                for gpu_idx in gpu_ids:
+                    occupied[gpu_idx] = occupied.get(gpu_idx, 0) + 1
+
+        # Each started experiment is counted once: the fresh reading already shows
+        # its load under greedy balancing, round-robin has only the counts to go on
+        if self.balance == "greedy":
+            initial_load = _gpu_load
+        else:
+            job_load = _job_load(self.gpus_per_experiment)
+            initial_load = lambda gpu: job_load * occupied.get(gpu.index, 0)
+        # Likewise, a GPU busy with our own experiments stays eligible until its
+        # slot cap says otherwise
+        gpus = detect_gpus()
+        eligible = _eligible_gpus(gpus, self.required_memory_gb)
+        eligible += [
+            gpu for gpu in _eligible_gpus(gpus, self.required_memory_gb, max_utilization=100)
+            if gpu.index in occupied and gpu not in eligible
+        ]
+        fresh = _assign(
+            eligible, len(pending_experiments), initial_load,
+            self.gpus_per_experiment,
+            _slot_cap(self.gpus_per_experiment, self.max_experiments_per_gpu),
+            occupied,
+        )
+        changed = {}
+        for slot, exp_idx in enumerate(pending_experiments):
+            gpu_ids = fresh[slot]
+            if self.allocation.get(exp_idx) != gpu_ids:
+                self.allocation[exp_idx] = gpu_ids
+                changed[exp_idx] = gpu_ids
+        return changed
 
 
 def format_cuda_visible_devices(gpu_indices: list[int]) -> str:
@@ -140,17 +404,21 @@ def format_cuda_visible_devices(gpu_indices: list[int]) -> str:
     return ",".join(str(i) for i in gpu_indices)
 
 
+_CODES = {
+    "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
+    "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
+    "red": "\033[91m",
+}
+
+
 def print_gpu_status(use_color: bool = True) -> None:
     """Print current GPU status."""
+    color = use_color and sys.stdout.isatty()
+
     def _c(text: str, *styles: str) -> str:
-        if not use_color or not sys.stdout.isatty():
+        if not color:
             return text
-        codes = {
-            "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
-            "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
-            "red": "\033[91m",
-        }
-        return "".join(codes.get(s, "") for s in styles) + text + codes["reset"]
+        return "".join(_CODES.get(s, "") for s in styles) + text + _CODES["reset"]
 
     gpus = detect_gpus()
 
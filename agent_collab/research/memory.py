@@ -1,11 +1,81 @@
 """Research Memory — tracks mistakes, insights, and learnings across rounds."""
 from __future__ import annotations
 
+import heapq
+import io
 import json
+import os
+import re
+import sys
 import time
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field, asdict
+from functools import partialmethod
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import IO, Deque, Iterator, List, Dict, Optional, Tuple
+
+try:
+    import orjson  # optional: C-speed JSON for large memories
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    _loads = orjson.loads
+else:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None).encode()
+
+    _loads = json.loads
+
+ENTRIES_FILE = "research_memory.ndjson"
+_DEDUP_WINDOW = 256  # snippet hashes remembered by extract_learnings_from_output
+
+_TYPE_EMOJI = {
+    "mistake": "❌",
+    "failure": "⚠️",
+    "insight": "💡",
+    "success": "✅",
+    "pattern": "🔍",
+}
+
+_now_cache: Tuple[int, str] = (-1, "")
+
+
+def _now_str() -> str:
+    """Local "%Y-%m-%d %H:%M:%S" timestamp, formatted at most once per second."""
+    global _now_cache
+    sec = int(time.time())
+    if _now_cache[0] != sec:
+        _now_cache = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)))
+    return _now_cache[1]
+
+
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """One case-insensitive alternation per keyword family — a single scan of the output."""
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+_MISTAKE_RE = _keyword_re(["mistake", "error", "failed", "didn't work", "wrong approach",
+                           "incorrect", "bug", "issue", "problem"])
+_INSIGHT_RE = _keyword_re(["insight:", "discovered", "found that", "key finding",
+                           "important:", "learned", "realized"])
+_SUCCESS_RE = _keyword_re(["success", "worked well", "improvement", "better than",
+                           "achieved", "solved", "optimal"])
+
+
+def _find_snippet(output: str, pattern: re.Pattern, before: int, after: int) -> Optional[str]:
+    """Return the text around the first keyword hit that yields a meaningful snippet."""
+    for m in pattern.finditer(output):
+        idx = m.start()
+        snippet = output[max(0, idx - before):idx + after].strip()
+        if len(snippet) > 20:  # Meaningful content
+            return snippet
+    return None
 
 
 @dataclass
@@ -20,77 +90,112 @@ class MemoryEntry:
 
     def to_markdown(self) -> str:
         """Format entry as markdown."""
-        emoji = {
-            "mistake": "❌",
-            "failure": "⚠️",
-            "insight": "💡",
-            "success": "✅",
-            "pattern": "🔍"
-        }.get(self.type, "📝")
-
-        lines = [f"### {emoji} {self.type.title()}: Round {self.round_num} - {self.step_name}"]
-        lines.append(f"*{self.timestamp}*\n")
-        lines.append(self.content)
+        buf = io.StringIO()
+        self.write_markdown(buf)
+        return buf.getvalue()
+
+    def write_markdown(self, buf: IO[str]) -> None:
+        """Write the markdown form of this entry into `buf`."""
+        emoji = _TYPE_EMOJI.get(self.type, "📝")
+
+        buf.write(f"### {emoji} {self.type.title()}: Round {self.round_num} - {self.step_name}\n")
+        buf.write(f"*{self.timestamp}*\n\n")
+        buf.write(self.content)
         if self.context:
-            lines.append(f"\n**Context:** {self.context}")
-        return "\n".join(lines)
+            buf.write(f"\n\n**Context:** {self.context}")
 
 
 @dataclass
 class ResearchMemory:
     """Accumulates learnings across research rounds."""
     goal: str
-    entries: List[MemoryEntry] = field(default_factory=list)
+    entries: Deque[MemoryEntry] = field(default_factory=deque)
     patterns: Dict[str, List[str]] = field(default_factory=dict)
-    created_at: str = field(default_factory=lambda: time.strftime("%Y-%m-%d %H:%M:%S"))
-
-    def add_mistake(self, round_num: int, step_name: str, content: str, context: str = ""):
-        """Record a mistake or failed approach."""
-        entry = MemoryEntry(
-            type="mistake",
-            round_num=round_num,
-            step_name=step_name,
-            content=content,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
-            context=context
-        )
-        self.entries.append(entry)
-
-    def add_insight(self, round_num: int, step_name: str, content: str, context: str = ""):
-        """Record a valuable insight or discovery."""
-        entry = MemoryEntry(
-            type="insight",
-            round_num=round_num,
-            step_name=step_name,
-            content=content,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
-            context=context
-        )
+    created_at: str = field(default_factory=_now_str)
+    # Live window size; older entries are only kept in the NDJSON log (the archive)
+    max_entries: int = 10_000
+    # Append-only entry log: where it lives and how many entries it already holds
+    _log_dir: Optional[Path] = field(default=None, init=False, repr=False, compare=False)
+    _persisted_count: int = field(default=0, init=False, repr=False, compare=False)
+    # Entries evicted from the window before a log existed to hold them
+    _unlogged: List[MemoryEntry] = field(default_factory=list, init=False, repr=False, compare=False)
+    # Per-type buckets of (insertion seq, entry) so context builders skip the full scan
+    _by_type: Dict[str, Deque[Tuple[int, MemoryEntry]]] = field(
+        default_factory=lambda: defaultdict(deque), init=False, repr=False, compare=False)
+    _type_totals: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _seq: int = field(default=0, init=False, repr=False, compare=False)
+    # LRU of recently extracted snippet hashes, to skip repeated keyword windows
+    _recent_hashes: OrderedDict[int, None] = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        initial, self.entries = self.entries, deque(maxlen=self.max_entries)
+        for entry in initial:
+            self._record(entry)
+
+    @property
+    def total_entries(self) -> int:
+        """Entries recorded so far, including those archived out of the live window."""
+        return self._seq
+
+    def _record(self, entry: MemoryEntry):
+        if len(self.entries) == self.entries.maxlen:
+            oldest = self.entries[0]
+            self._by_type[oldest.type].popleft()
+            if self._seq - len(self.entries) >= self._persisted_count:
+                self._unlogged.append(oldest)
         self.entries.append(entry)
-
-    def add_success(self, round_num: int, step_name: str, content: str, context: str = ""):
-        """Record a successful approach or technique."""
-        entry = MemoryEntry(
-            type="success",
+        self._by_type[entry.type].append((self._seq, entry))
+        self._type_totals[entry.type] = self._type_totals.get(entry.type, 0) + 1
+        self._seq += 1
+
+    def _recent(self, types: Tuple[str, ...], n: int) -> List[MemoryEntry]:
+        """Last n entries of the given types, oldest first."""
+        newest = heapq.merge(*(islice(reversed(self._by_type[t]), n) for t in types), reverse=True)
+        return [entry for _, entry in islice(newest, n)][::-1]
+
+    def count(self, *types: str) -> int:
+        """Number of entries of the given types, archived ones included."""
+        return sum(self._type_totals.get(t, 0) for t in types)
+
+    def _archived(self) -> Iterator[MemoryEntry]:
+        """Entries evicted from the live window, oldest first."""
+        logged = min(self._persisted_count, self._seq - len(self.entries))
+        if logged:
+            with open(self._log_dir / ENTRIES_FILE, "rb") as f:
+                for line in islice(f, logged):
+                    yield MemoryEntry(**_loads(line))
+        yield from self._unlogged
+
+    def _persist(self):
+        """Append entries not yet in the NDJSON log (no-op until a session dir is known)."""
+        if self._log_dir is None or self._persisted_count >= self._seq:
+            return
+        first_live = self._seq - len(self.entries)
+        pending = chain(self._unlogged,
+                        islice(self.entries, max(self._persisted_count - first_live, 0), None))
+        with open(self._log_dir / ENTRIES_FILE, "ab") as f:
+            for entry in pending:
+                f.write(_dumps(asdict(entry)) + b"\n")
+        self._unlogged.clear()
+        self._persisted_count = self._seq
+
+    def _add(self, type_: str, round_num: int, step_name: str, content: str, context: str = ""):
+        """Record one entry of the given type and append it to the log."""
+        self._record(MemoryEntry(
+            type=type_,
             round_num=round_num,
             step_name=step_name,
             content=content,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            timestamp=_now_str(),
             context=context
-        )
-        self.entries.append(entry)
+        ))
+        self._persist()
 
-    def add_failure(self, round_num: int, step_name: str, content: str, context: str = ""):
-        """Record a failed experiment or approach."""
-        entry = MemoryEntry(
-            type="failure",
-            round_num=round_num,
-            step_name=step_name,
-            content=content,
-            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
-            context=context
-        )
-        self.entries.append(entry)
+    add_mistake = partialmethod(_add, "mistake")  # mistake or failed approach
+    add_insight = partialmethod(_add, "insight")  # valuable insight or discovery
+    add_success = partialmethod(_add, "success")  # successful approach or technique
+    add_failure = partialmethod(_add, "failure")  # failed experiment or approach
 
     def add_pattern(self, pattern_name: str, observation: str):
         """Record an emerging pattern across rounds."""
@@ -100,11 +205,10 @@ class ResearchMemory:
 
     def get_mistakes_context(self, max_recent: int = 10) -> str:
         """Get recent mistakes to avoid repeating them."""
-        mistakes = [e for e in self.entries if e.type in ("mistake", "failure")]
-        if not mistakes:
+        recent = self._recent(("mistake", "failure"), max_recent)
+        if not recent:
             return "No previous mistakes recorded."
 
-        recent = mistakes[-max_recent:]
         lines = ["=== MISTAKES TO AVOID ==="]
         for m in recent:
             lines.append(f"- [R{m.round_num}/{m.step_name}] {m.content}")
@@ -112,11 +216,10 @@ class ResearchMemory:
 
     def get_insights_context(self, max_recent: int = 10) -> str:
         """Get recent insights to build upon."""
-        insights = [e for e in self.entries if e.type in ("insight", "success")]
-        if not insights:
+        recent = self._recent(("insight", "success"), max_recent)
+        if not recent:
             return "No insights recorded yet."
 
-        recent = insights[-max_recent:]
         lines = ["=== KEY INSIGHTS ==="]
         for i in recent:
             lines.append(f"- [R{i.round_num}/{i.step_name}] {i.content}")
@@ -127,18 +230,18 @@ class ResearchMemory:
         parts = []
 
         # Recent mistakes/failures
-        mistakes = [e for e in self.entries if e.type in ("mistake", "failure")]
+        mistakes = self._recent(("mistake", "failure"), max_per_type)
         if mistakes:
             parts.append("🚫 AVOID THESE (Recent Mistakes/Failures):")
-            for m in mistakes[-max_per_type:]:
+            for m in mistakes:
                 parts.append(f"  • [R{m.round_num}] {m.content[:200]}")
             parts.append("")
 
         # Recent insights/successes
-        insights = [e for e in self.entries if e.type in ("insight", "success")]
+        insights = self._recent(("insight", "success"), max_per_type)
         if insights:
             parts.append("💡 BUILD ON THESE (Key Insights/Successes):")
-            for i in insights[-max_per_type:]:
+            for i in insights:
                 parts.append(f"  • [R{i.round_num}] {i.content[:200]}")
             parts.append("")
 
@@ -156,125 +259,120 @@ class ResearchMemory:
 
         return "\n".join(parts)
 
+    def _seen_recently(self, snippet: str) -> bool:
+        """True if a near-identical snippet was extracted recently; otherwise remember it."""
+        key = hash(snippet[:120].strip().lower())
+        if key in self._recent_hashes:
+            self._recent_hashes.move_to_end(key)
+            return True
+        self._recent_hashes[key] = None
+        if len(self._recent_hashes) > _DEDUP_WINDOW:
+            self._recent_hashes.popitem(last=False)
+        return False
+
     def extract_learnings_from_output(self, output: str, round_num: int, step_name: str):
         """Automatically extract learnings from agent output using keyword detection."""
-        output_lower = output.lower()
-
         # Detect mistakes/failures
-        mistake_keywords = ["mistake", "error", "failed", "didn't work", "wrong approach",
-                           "incorrect", "bug", "issue", "problem"]
-        for keyword in mistake_keywords:
-            if keyword in output_lower:
-                # Try to extract context around the keyword
-                idx = output_lower.find(keyword)
-                context_start = max(0, idx - 50)
-                context_end = min(len(output), idx + 150)
-                snippet = output[context_start:context_end].strip()
-                if len(snippet) > 20:  # Meaningful content
-                    self.add_mistake(round_num, step_name, snippet)
-                    break
+        snippet = _find_snippet(output, _MISTAKE_RE, 50, 150)
+        if snippet and not self._seen_recently(snippet):
+            self.add_mistake(round_num, step_name, snippet)
 
         # Detect insights
-        insight_keywords = ["insight:", "discovered", "found that", "key finding",
-                          "important:", "learned", "realized"]
-        for keyword in insight_keywords:
-            if keyword in output_lower:
-                idx = output_lower.find(keyword)
-                context_start = max(0, idx - 20)
-                context_end = min(len(output), idx + 200)
-                snippet = output[context_start:context_end].strip()
-                if len(snippet) > 20:
-                    self.add_insight(round_num, step_name, snippet)
-                    break
+        snippet = _find_snippet(output, _INSIGHT_RE, 20, 200)
+        if snippet and not self._seen_recently(snippet):
+            self.add_insight(round_num, step_name, snippet)
 
         # Detect successes
-        success_keywords = ["success", "worked well", "improvement", "better than",
-                          "achieved", "solved", "optimal"]
-        for keyword in success_keywords:
-            if keyword in output_lower:
-                idx = output_lower.find(keyword)
-                context_start = max(0, idx - 50)
-                context_end = min(len(output), idx + 150)
-                snippet = output[context_start:context_end].strip()
-                if len(snippet) > 20:
-                    self.add_success(round_num, step_name, snippet)
-                    break
+        snippet = _find_snippet(output, _SUCCESS_RE, 50, 150)
+        if snippet and not self._seen_recently(snippet):
+            self.add_success(round_num, step_name, snippet)
 
     def to_markdown(self) -> str:
         """Generate full markdown report."""
-        lines = [
-            f"# Research Learning Log",
-            f"",
-            f"**Research Goal:** {self.goal}",
-            f"**Created:** {self.created_at}",
-            f"**Total Entries:** {len(self.entries)}",
-            f"",
-            f"---",
-            f""
-        ]
+        buf = io.StringIO()
+        buf.write(
+            f"# Research Learning Log\n\n"
+            f"**Research Goal:** {self.goal}\n"
+            f"**Created:** {self.created_at}\n"
+            f"**Total Entries:** {self._seq}\n\n"
+            f"---\n\n"
+        )
 
         # Summary by type
-        by_type = {}
-        for entry in self.entries:
-            if entry.type not in by_type:
-                by_type[entry.type] = []
-            by_type[entry.type].append(entry)
-
-        lines.append("## 📊 Summary")
-        for entry_type, entries in by_type.items():
-            emoji = {"mistake": "❌", "failure": "⚠️", "insight": "💡",
-                    "success": "✅", "pattern": "🔍"}.get(entry_type, "📝")
-            lines.append(f"- {emoji} {entry_type.title()}: {len(entries)}")
-        lines.append("")
+        buf.write("## 📊 Summary\n")
+        for entry_type, total in self._type_totals.items():
+            emoji = _TYPE_EMOJI.get(entry_type, "📝")
+            buf.write(f"- {emoji} {entry_type.title()}: {total}\n")
+        buf.write("\n")
 
         # Patterns
         if self.patterns:
-            lines.append("## 🔍 Emerging Patterns")
+            buf.write("## 🔍 Emerging Patterns\n")
             for pattern_name, observations in self.patterns.items():
-                lines.append(f"\n### {pattern_name}")
-                lines.append(f"*{len(observations)} observation(s)*\n")
+                buf.write(f"\n### {pattern_name}\n")
+                buf.write(f"*{len(observations)} observation(s)*\n\n")
                 for i, obs in enumerate(observations, 1):
-                    lines.append(f"{i}. {obs}")
-            lines.append("\n---\n")
+                    buf.write(f"{i}. {obs}\n")
+            buf.write("\n---\n\n")
 
         # All entries chronologically
-        lines.append("## 📝 Chronological Log")
-        for entry in self.entries:
-            lines.append("")
-            lines.append(entry.to_markdown())
-            lines.append("")
+        buf.write("## 📝 Chronological Log")
+        for entry in chain(self._archived(), self.entries):
+            buf.write("\n\n")
+            entry.write_markdown(buf)
+            buf.write("\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     def save(self, session_dir: Path) -> Path:
-        """Save memory to both JSON and Markdown."""
-        # Save JSON for programmatic access
+        """
+        Checkpoint memory: new entries are appended to research_memory.ndjson and
+        a small research_memory.json index is rewritten. The Markdown report is
+        only produced by finalize().
+        """
+        session_dir = session_dir.resolve()
+        if self._log_dir != session_dir:
+            # New location: start its log with the archive, then every live entry
+            with open(session_dir / ENTRIES_FILE, "wb") as f:
+                for entry in self._archived():
+                    f.write(_dumps(asdict(entry)) + b"\n")
+            self._unlogged.clear()
+            self._log_dir = session_dir
+            self._persisted_count = self._seq - len(self.entries)
+        self._persist()
+        with open(session_dir / ENTRIES_FILE, "ab") as f:
+            os.fsync(f.fileno())
+
         json_path = session_dir / "research_memory.json"
         data = {
             "goal": self.goal,
             "created_at": self.created_at,
-            "entries": [asdict(e) for e in self.entries],
+            "entries_file": ENTRIES_FILE,
+            "entry_count": self._seq,
             "patterns": self.patterns
         }
-        with open(json_path, "w") as f:
-            json.dump(data, f, indent=2)
+        json_path.write_bytes(_dumps(data, indent=True))
+
+        return json_path
 
-        # Save Markdown for human reading
+    def finalize(self, session_dir: Path) -> Path:
+        """
+        Write the Markdown report for human reading. The entry log stays where
+        save() checkpoints it, so finalizing elsewhere rewrites nothing.
+        """
         md_path = session_dir / "research_learnings.md"
         md_path.write_text(self.to_markdown())
-
         return md_path
 
     @classmethod
     def load(cls, session_dir: Path, goal: str = "") -> "ResearchMemory":
-        """Load memory from JSON file."""
+        """Load memory from the JSON index and its NDJSON entry log."""
         json_path = session_dir / "research_memory.json"
 
         if not json_path.exists():
             return cls(goal=goal)
 
-        with open(json_path) as f:
-            data = json.load(f)
+        data = _loads(json_path.read_bytes())
 
         memory = cls(
             goal=data.get("goal", goal),
@@ -282,8 +380,27 @@ class ResearchMemory:
             patterns=data.get("patterns", {})
         )
 
+        # Older sessions kept every entry inline in the JSON file
         for e_data in data.get("entries", []):
-            entry = MemoryEntry(**e_data)
-            memory.entries.append(entry)
+            memory._record(MemoryEntry(**e_data))
+
+        log_path = session_dir / data.get("entries_file", ENTRIES_FILE)
+        if "entries_file" in data and log_path.exists():
+            # Log already holds everything: keep appending to it; entries that
+            # fall out of the live window stay readable from it
+            memory._log_dir = session_dir.resolve()
+            with open(log_path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        memory._record(MemoryEntry(**_loads(line)))
+                        memory._persisted_count += 1
+        elif "entries_file" in data:
+            # Index without its log (e.g. a session dir copied without it): say so
+            # loudly, and leave _log_dir unset so save() starts a fresh log
+            print(
+                f"  ⚠️  {log_path} is missing; {data.get('entry_count', 0)} "
+                f"research memory entries could not be loaded",
+                file=sys.stderr,
+            )
 
         return memory
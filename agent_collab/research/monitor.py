@@ -1,28 +1,52 @@
 """Background task monitoring for long-running experiments (e.g., deep learning training)."""
 from __future__ import annotations
 
+import ctypes
+import functools
+import io
 import os
 import re
+import select
+import stat
+import struct
 import subprocess
 import sys
 import threading
 import time
-from dataclasses import dataclass
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Callable, List, Dict, Any
+from typing import Optional, Callable, List, Dict, Any, Deque, Tuple
+
+try:
+    import ahocorasick  # optional: one-pass multi-literal failure scan
+except ImportError:
+    ahocorasick = None
+
+try:
+    import hyperscan  # optional: all failure regexes in one SIMD DFA scan
+except ImportError:
+    hyperscan = None
 
 _USE_COLOR = sys.stdout.isatty()
 
 
+_CODES = {
+    "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
+    "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
+    "red": "\033[91m", "blue": "\033[94m", "magenta": "\033[95m",
+}
+_STYLE_CACHE: Dict[Tuple[str, ...], str] = {}  # styles -> joined escape prefix
+
+
 def _c(text: str, *styles: str) -> str:
     if not _USE_COLOR:
         return text
-    codes = {
-        "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
-        "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
-        "red": "\033[91m", "blue": "\033[94m", "magenta": "\033[95m",
-    }
-    return "".join(codes.get(s, "") for s in styles) + text + codes["reset"]
+    prefix = _STYLE_CACHE.get(styles)
+    if prefix is None:
+        prefix = _STYLE_CACHE[styles] = "".join(_CODES.get(s, "") for s in styles)
+    return prefix + text + _CODES["reset"]
 
 
 SPINNER = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
@@ -40,6 +64,23 @@ class TaskProgress:
     status: str = "running"  # running | completed | failed
     exit_code: Optional[int] = None
     error_message: str = ""
+    # Every parsed value of each metric, oldest first, one packed float array per metric
+    metric_history: Dict[str, array] = field(default_factory=dict, repr=False)
+
+    def history(self, metric: str) -> array:
+        """Copy of all values seen for `metric` (empty if it never appeared)."""
+        values = self.metric_history.get(metric)
+        return array("d", values) if values is not None else array("d")
+
+    def record_metric(self, metric: str, value: float) -> None:
+        """Set the latest value of `metric` and append it to its history."""
+        if self.current_metric is None:
+            self.current_metric = {}
+        self.current_metric[metric] = value
+        values = self.metric_history.get(metric)
+        if values is None:
+            values = self.metric_history[metric] = array("d")
+        values.append(value)
 
 
 @dataclass
@@ -49,6 +90,219 @@ class CompletionPattern:
     failure_patterns: List[str]  # Regex patterns indicating failure
     completion_file: Optional[str] = None  # File created on completion
     timeout_seconds: Optional[int] = None  # Max time to wait
+    # Lowercase substrings at least one of which every failure match contains;
+    # when set, the failure regex is skipped for buffers that contain none of them
+    failure_keywords: Optional[Tuple[str, ...]] = None
+
+    def __post_init__(self) -> None:
+        self.compiled_success = [_compile_pattern(p) for p in self.success_patterns]
+        self.compiled_failure = [_compile_pattern(p) for p in self.failure_patterns]
+        # One alternation per list so a log buffer is scanned once, not once per pattern
+        self.success_union = _union(self.compiled_success)
+        self.failure_union = _union(self.compiled_failure)
+        # Byte-level twins for scanning a mapped log file without decoding it
+        self._success_union_b = _union(self.compiled_success, as_bytes=True)
+        self._failure_union_b = _union(self.compiled_failure, as_bytes=True)
+        self._bytes_ok = (
+            (self._success_union_b is not None or not self.compiled_success)
+            and (self._failure_union_b is not None or not self.compiled_failure)
+        )
+        # With pyahocorasick, plain-literal failure patterns go into one automaton
+        # and only the rest still need the regex engine
+        self._failure_ac = None
+        failure_rest = self.compiled_failure
+        if ahocorasick is not None and self._bytes_ok:
+            literals, rest = _split_literals(self.compiled_failure)
+            if literals:
+                self._failure_ac = ahocorasick.Automaton()
+                for literal in literals:
+                    # Match on bytes: latin-1 maps each byte to one code point
+                    self._failure_ac.add_word(literal.encode().lower().decode("latin-1"), literal)
+                self._failure_ac.make_automaton()
+                failure_rest = rest
+        self._failure_rest_b = _union(failure_rest, as_bytes=True)
+        # Hyperscan, when installed and able to compile every pattern, replaces both
+        self._failure_hs = _hs_database(self.compiled_failure) if self._bytes_ok else None
+        self._hs_lock = threading.Lock()  # a database's scratch space is single-threaded
+        # Case-sensitive versions for the window lowercased once with bytes.lower():
+        # several times faster than case folding inside the regex engine.
+        # None where a pattern can't be safely rewritten; the caseless one is used then.
+        self._success_lower_b = _union(self.compiled_success, as_bytes=True, lowered=True)
+        self._failure_rest_lower_b = _union(failure_rest, as_bytes=True, lowered=True)
+
+    def first_success(self, content: str) -> Optional[re.Match]:
+        return _first_match(self.success_union, self.compiled_success, content)
+
+    def first_failure(self, content: str) -> Optional[re.Match]:
+        if self.failure_keywords is not None:
+            content_lower = content.lower()
+            if not any(tok in content_lower for tok in self.failure_keywords):
+                return None
+        return _first_match(self.failure_union, self.compiled_failure, content)
+
+    def scan(self, buf, pos: int = 0) -> Optional[str]:
+        """Return "failed", "completed" or None for a bytes-like log window starting at `pos`."""
+        if not self._bytes_ok:
+            content = buf[pos:].decode("utf-8", "replace")
+            if self.first_failure(content):
+                return "failed"
+            return "completed" if self.first_success(content) else None
+
+        window_lower = buf[pos:].lower()
+        if self._failure_union_b is not None:
+            maybe_failed = True
+            if self.failure_keywords is not None:
+                maybe_failed = any(tok.encode() in window_lower for tok in self.failure_keywords)
+            if maybe_failed and self._failure_hs is not None:
+                if self._hs_search(buf[pos:]):
+                    return "failed"
+            elif maybe_failed:
+                if self._failure_ac is not None and next(self._failure_ac.iter(window_lower.decode("latin-1")), None):
+                    return "failed"
+                if _search_either(self._failure_rest_lower_b, self._failure_rest_b, window_lower, buf, pos):
+                    return "failed"
+        if _search_either(self._success_lower_b, self._success_union_b, window_lower, buf, pos):
+            return "completed"
+        return None
+
+    def _hs_search(self, data: bytes) -> bool:
+        with self._hs_lock:
+            try:
+                # Returning True from the handler stops the scan at the first match
+                self._failure_hs.scan(data, match_event_handler=lambda *_: True)
+            except hyperscan.ScanTerminated:
+                return True
+        return False
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a completion pattern; invalid regexes (e.g. agent-supplied) match literally."""
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return re.compile(re.escape(pattern), re.IGNORECASE)
+
+
+def _union(
+    compiled: List[re.Pattern], as_bytes: bool = False, lowered: bool = False
+) -> Optional[re.Pattern]:
+    """Fuse patterns into a single alternation, or None if they can't be combined.
+
+    With `lowered`, the bytes alternation is case-sensitive and meant for text
+    already passed through bytes.lower().
+    """
+    if not compiled:
+        return None
+    # Inline global flags are only legal at the start of the whole expression;
+    # every pattern is compiled case-insensitive anyway.
+    sources = [p.pattern[4:] if p.pattern.startswith("(?i)") else p.pattern for p in compiled]
+    if lowered:
+        lowered_sources = [_lowered_source(src.encode()) for src in sources]
+        if None in lowered_sources:
+            return None
+        source = b"|".join(b"(?:" + src + b")" for src in lowered_sources)
+        try:
+            return re.compile(source)
+        except re.error:
+            return None
+    source = "|".join(f"(?:{src})" for src in sources)
+    try:
+        return re.compile(source.encode() if as_bytes else source, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def _lowered_source(src: bytes) -> Optional[bytes]:
+    """Rewrite a caseless bytes regex to match lowercased text case-sensitively.
+
+    ASCII letters outside escapes are lowercased. Returns None for constructs
+    where that could change the meaning: numeric/named character escapes,
+    uppercase letters inside [...] (ranges like [A-z]) and inline flag groups.
+    A "]" right after "[" or "[^" is a class member, not the end of the class.
+    """
+    out = bytearray()
+    in_class = False
+    i = 0
+    while i < len(src):
+        ch = src[i:i + 1]
+        if ch == b"\\":
+            escaped = src[i + 1:i + 2]
+            if not escaped or escaped in b"xuUN0123456789":
+                return None
+            out += ch + escaped  # \S, \W, \D, \B, ... keep their meaning on lowered text
+            i += 2
+            continue
+        if in_class:
+            if ch.isupper():
+                return None
+            in_class = ch != b"]"
+        elif ch == b"[":
+            # Opening bracket, optional negation and a leading literal "]" in one go
+            end = i + 1
+            if src[end:end + 1] == b"^":
+                end += 1
+            if src[end:end + 1] == b"]":
+                end += 1
+            out += src[i:end]
+            in_class = True
+            i = end
+            continue
+        elif ch == b"(" and src[i + 1:i + 2] == b"?" and src[i + 2:i + 3] not in (b":", b"=", b"!", b"<", b"#"):
+            return None
+        out += ch.lower()
+        i += 1
+    return bytes(out)
+
+
+def _search_either(
+    lowered: Optional[re.Pattern], caseless: Optional[re.Pattern], buf_lower, buf, pos: int
+) -> bool:
+    """Search with the lowered-text pattern when there is one, else the caseless one."""
+    if lowered is not None:
+        return lowered.search(buf_lower) is not None
+    return caseless is not None and caseless.search(buf, pos) is not None
+
+
+def _hs_database(compiled: List[re.Pattern]):
+    """Compile patterns into one caseless Hyperscan database, or None."""
+    if hyperscan is None or not compiled:
+        return None
+    expressions = [(p.pattern[4:] if p.pattern.startswith("(?i)") else p.pattern).encode() for p in compiled]
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+        )
+    except hyperscan.error:
+        return None  # e.g. a custom pattern using back-references
+    return db
+
+
+def _split_literals(compiled: List[re.Pattern]) -> Tuple[List[str], List[re.Pattern]]:
+    """Partition patterns into plain literal phrases and ones needing regex features."""
+    literals, rest = [], []
+    for p in compiled:
+        src = p.pattern[4:] if p.pattern.startswith("(?i)") else p.pattern
+        if src and re.escape(src) == src:
+            literals.append(src)
+        else:
+            rest.append(p)
+    return literals, rest
+
+
+def _first_match(
+    union: Optional[re.Pattern], compiled: List[re.Pattern], content: str
+) -> Optional[re.Match]:
+    if union is not None:
+        return union.search(content)
+    for pattern in compiled:
+        match = pattern.search(content)
+        if match:
+            return match
+    return None
 
 
 DEFAULT_PATTERNS = CompletionPattern(
@@ -93,8 +347,244 @@ DEFAULT_PATTERNS = CompletionPattern(
         r"(?i)exit\s+code\s*:\s*[1-9]",
     ],
     timeout_seconds=24 * 3600,  # 24 hours default
+    failure_keywords=(
+        "error", "exception", "traceback", "cuda", "memory", "file", "denied",
+        "module", "failed", "fatal", "aborted", "killed", "process", "exit",
+    ),
 )
 
+# Epoch pattern: "Epoch 5/60" or "Epoch: 5/60"
+_EPOCH_RE = re.compile(r'epoch[:\s]*(\d+)\s*/\s*(\d+)', re.IGNORECASE)
+
+# Metric patterns: "Loss: 1.234", "AUC=0.985", "Pixel AP: 58.3%", "I-AUROC=0.9917".
+# Each regex is gated by a lowercase substring it cannot match without, so the
+# bulk of log lines (which mention no metric at all) never reach the regex engine.
+_COMPILED_METRIC_PATTERNS = [
+    (token, re.compile(pattern, re.IGNORECASE), name) for token, pattern, name in [
+        ('loss', r'loss[:\s]+([\d.]+)', 'loss'),
+        ('auc', r'auc[:\s=]+([\d.]+)', 'auc'),
+        ('i-auroc', r'I-AUROC[:\s=]+([\d.]+)', 'I-AUROC'),
+        ('p-auroc', r'P-AUROC[:\s=]+([\d.]+)', 'P-AUROC'),
+        ('i-ap', r'I-AP[:\s=]+([\d.]+)', 'I-AP'),
+        ('p-ap', r'P-AP[:\s=]+([\d.]+)', 'P-AP'),
+        ('i-f1', r'I-F1[:\s=]+([\d.]+)', 'I-F1'),
+        ('p-f1', r'P-F1[:\s=]+([\d.]+)', 'P-F1'),
+        ('aupro', r'AUPRO[:\s=]+([\d.]+)', 'AUPRO'),
+        ('pixel', r'pixel\s*ap[:\s]+([\d.]+)', 'pixel_ap'),
+        ('image', r'image\s*auc[:\s]+([\d.]+)', 'image_auc'),
+    ]
+]
+# Byte-level union of the tokens above (plus 'epoch'): lines without any of them
+# are skipped before being decoded
+_PROGRESS_HINT_RE = re.compile(rb'epoch|loss|auc|auroc|[ip]-(?:ap|f1)|aupro|pixel|image', re.IGNORECASE)
+
+# The log summary also reports accuracy
+_SUMMARY_METRIC_PATTERNS = _COMPILED_METRIC_PATTERNS + [
+    ('accuracy', re.compile(r'accuracy[:\s]+([\d.]+)', re.IGNORECASE), 'accuracy'),
+]
+
+
+def _parse_epoch(line: str, line_lower: str) -> Optional[Tuple[int, int]]:
+    """(current, total) from an "Epoch 5/60"-style line, if present."""
+    match = _EPOCH_RE.search(line) if 'epoch' in line_lower else None
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _build_metric_parser(
+    metric_patterns: List[Tuple[str, re.Pattern, str]]
+) -> Callable[[str, str, Callable[[str, float], None]], None]:
+    """Generate `parse(line, line_lower, emit)` with one unrolled branch per metric.
+
+    `emit(metric, value)` is called for each metric found, percentages scaled
+    to [0, 1]. Straight-line code avoids the per-line loop, tuple unpacking
+    and generator overhead on the log parsing hot path.
+    """
+    namespace: Dict[str, Any] = {}
+    src = ["def parse(line, line_lower, emit):"]
+    for i, (token, pattern, metric_name) in enumerate(metric_patterns):
+        namespace[f"_R{i}"] = pattern
+        # Convert percentage to decimal if needed (loss is left as is)
+        value = "v" if metric_name == 'loss' else "v / 100.0 if v > 1.0 else v"
+        src += [
+            f"    if {token!r} in line_lower:",
+            f"        m = _R{i}.search(line)",
+            "        if m:",
+            "            try:",
+            "                v = float(m.group(1))",
+            "            except ValueError:",
+            "                pass",
+            "            else:",
+            f"                emit({metric_name!r}, {value})",
+        ]
+    exec("\n".join(src), namespace)
+    return namespace["parse"]
+
+
+_parse_metrics = _build_metric_parser(_COMPILED_METRIC_PATTERNS)
+_parse_summary_metrics = _build_metric_parser(_SUMMARY_METRIC_PATTERNS)
+
+
+_SUMMARY_COMPLETED_RE = re.compile(r'(?i)training\s+completed|experiment\s+(?:finished|completed)')
+# Every token get_log_summary_from_lines reacts to, for a single pre-check per lowercased line
+_SUMMARY_HINT_RE = re.compile('|'.join(re.escape(token) for token in (
+    'epoch', *(token for token, _, _ in _SUMMARY_METRIC_PATTERNS),
+    'error:', 'exception:', 'warning', 'completed', 'finished', 'failed',
+)))
+
+_COMMAND_RE = re.compile(r'COMMAND:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+_LOG_FILE_RE = re.compile(r'LOG_FILE:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+_COMPLETION_PATTERN_RE = re.compile(r'COMPLETION_PATTERN:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+_ESTIMATED_TIME_RE = re.compile(r'ESTIMATED_TIME:\s*(.+?)(?:\n|$)', re.IGNORECASE)
+
+
+_TAIL_BLOCK = 65536
+_TAIL_LINES = 1000  # recent log lines a monitor keeps for error context and summaries
+_PIPE_CHUNK = 65536
+_SCAN_OVERLAP = 512  # bytes of already-scanned log re-checked for boundary-straddling matches
+
+
+def _tail_bytes_limit() -> int:
+    """Byte cap on log tails from AGENT_COLLAB_TAIL_BYTES (default 1 MiB, at least 64 KiB)."""
+    try:
+        limit = int(os.environ.get("AGENT_COLLAB_TAIL_BYTES", str(1 << 20)))
+    except ValueError:
+        return 1 << 20
+    return max(limit, _TAIL_BLOCK)
+
+
+# Tails (the monitor's recent lines, _tail_lines reads) never hold more than this,
+# however long the lines are; a line longer than the cap keeps only its end
+_TAIL_BYTES = _tail_bytes_limit()
+
+
+def _tail_lines(path: Path, n_lines: int, block: int = _TAIL_BLOCK) -> List[str]:
+    """Return the last `n_lines` lines of `path` like `readlines()[-n_lines:]`.
+
+    Reads backwards from the end in `block`-sized chunks until enough line
+    breaks have been seen, so the cost is bounded by the tail size rather
+    than the size of the whole log. Reading also stops after _TAIL_BYTES, so
+    fewer (or truncated) lines come back when they are very long.
+    CR, CRLF and LF all end a line.
+    """
+    if n_lines <= 0:
+        return []
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            # Pipes and special files (e.g. /proc, which report size 0) can't be
+            # read backwards: stream through them keeping only the last n_lines resident
+            text = io.TextIOWrapper(f, encoding="utf-8", errors="replace")
+            return list(deque(text, maxlen=n_lines))
+        pos = st.st_size
+        buf = b""
+        enough = False
+        while pos > 0 and st.st_size - pos < _TAIL_BYTES:
+            step = min(block, pos, _TAIL_BYTES - (st.st_size - pos))
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            breaks = buf.count(b"\n") + buf.count(b"\r") - buf.count(b"\r\n")
+            if breaks > n_lines:
+                enough = True
+                break
+
+    if enough:
+        # Drop the (possibly partial) first line; when the byte cap stopped the
+        # read instead, it is kept truncated
+        cut = min((i for i in (buf.find(b"\r"), buf.find(b"\n")) if i >= 0))
+        cut += 2 if buf[cut:cut + 2] == b"\r\n" else 1
+        buf = buf[cut:]
+
+    return _decode_lines(buf)[-n_lines:]
+
+
+def _decode_lines(buf: bytes) -> List[str]:
+    """Split raw log bytes into text lines the way text-mode readlines() would."""
+    text = buf.decode("utf-8", "replace").replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    last = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+_MIN_POLL = 0.5  # seconds; floor between monitor passes when woken by log writes
+
+
+def _open_pidfd(pid: int) -> Optional[int]:
+    """A descriptor that turns readable when `pid` exits (Linux 5.3+), or None."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        return None
+
+
+class _LogWatcher:
+    """Wait for writes to a log file via Linux inotify (through libc), with a timeout."""
+
+    # IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _MASK = 0x002 | 0x008 | 0x080 | 0x100
+
+    def __init__(self, log_path: Path):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._name = os.fsencode(log_path.name)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory so the log may be created or replaced after we start
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(log_path.parent)), self._MASK) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    @classmethod
+    def open(cls, log_path: Path) -> Optional["_LogWatcher"]:
+        """Return a watcher, or None where inotify isn't available."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return cls(log_path)
+        except (OSError, AttributeError):
+            return None
+
+    def wait(self, timeout: float, exit_fd: Optional[int] = None) -> bool:
+        """Return once the log is written to or `timeout` seconds have passed.
+
+        With `exit_fd` (a pidfd), also return as soon as the process exits;
+        the result tells whether that is what happened.
+        """
+        fds = [self._fd] if exit_fd is None else [self._fd, exit_fd]
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select(fds, [], [], remaining)
+            if exit_fd is not None and exit_fd in ready:
+                return True
+            if not ready or self._log_touched():
+                return False
+
+    def _log_touched(self) -> bool:
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return False
+        touched = False
+        offset = 0
+        while offset + 16 <= len(data):
+            _wd, _mask, _cookie, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+            touched = touched or name == self._name
+            offset += 16 + length
+        return touched
+
+    def close(self) -> None:
+        os.close(self._fd)
+
 
 class BackgroundMonitor:
     """Monitor a background process and track its progress via log files."""
@@ -133,9 +623,28 @@ class BackgroundMonitor:
         self.process: Optional[subprocess.Popen] = None
         self.progress = TaskProgress(task_id=task_id, started_at=time.time(), last_update=time.time())
         self._monitor_thread: Optional[threading.Thread] = None
+        self._drain_thread: Optional[threading.Thread] = None
         self._stop_flag = threading.Event()
+        self._finished = threading.Event()  # set when the monitor loop exits
         self._log_position = 0
+        # Read-only descriptor on the log, kept open across polls, and the
+        # (st_dev, st_ino) it refers to so a replaced log gets reopened
+        self._log_fd: Optional[int] = None
+        self._log_id: Optional[Tuple[int, int]] = None
         self._last_log_display = 0  # Track when we last showed log tail
+        self._last_summary_position = -1  # Log offset the last live summary covered
+        # Raw recent log lines, fed by _parse_log_progress so the completion
+        # check and the periodic summary don't re-read the file
+        self._tail: Deque[bytes] = deque()
+        self._tail_size = 0  # bytes held in _tail; capped at _TAIL_BYTES
+        # Log bytes not yet checked for completion, and the end of the last checked chunk
+        self._unscanned = bytearray()
+        self._scan_overlap = b""
+        # Outcome of chunks scanned early because _unscanned outgrew _TAIL_BYTES,
+        # and the chunk holding the failure, for error details
+        self._scan_outcome: Optional[str] = None
+        self._failed_chunk = b""
+        self._ingest_lock = threading.Lock()  # output may be fed from the pipe drainer thread
 
     def start(self) -> None:
         """Start the background process and monitoring."""
@@ -145,16 +654,25 @@ class BackgroundMonitor:
             self.cwd.mkdir(parents=True, exist_ok=True)
             log_path = self.cwd / self.log_file
             log_path.parent.mkdir(parents=True, exist_ok=True)
-            log_handle = open(log_path, "w")
-
-        self.process = subprocess.Popen(
-            self.command,
-            shell=True,
-            cwd=str(self.cwd),
-            stdout=log_handle or subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
+            # Only the child writes to it, so no Python-side buffering
+            log_handle = open(log_path, "wb", buffering=0)
+
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                shell=True,
+                cwd=str(self.cwd),
+                stdout=log_handle or subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        finally:
+            if log_handle:
+                log_handle.close()  # the child has its own copy of the descriptor
+        if self.process.stdout is not None:
+            # No log file: drain the pipe so the task can't block on a full pipe
+            # buffer, feeding the output through the same parsing as a log
+            self._drain_thread = threading.Thread(target=self._drain_pipe, daemon=True)
+            self._drain_thread.start()
 
         print(_c(f"  🚀 Started background task: {self.task_id}", "cyan"))
         print(_c(f"  📝 PID: {self.process.pid}", "dim"))
@@ -203,9 +721,25 @@ class BackgroundMonitor:
 
     def _monitor_loop(self) -> None:
         """Main monitoring loop running in background thread."""
+        watcher = _LogWatcher.open(self.cwd / self.log_file) if self.log_file else None
+        exit_fd = _open_pidfd(self.process.pid) if self.process else None
+        try:
+            self._monitor_passes(watcher, exit_fd)
+        finally:
+            if watcher:
+                watcher.close()
+            if exit_fd is not None:
+                os.close(exit_fd)
+            self._close_log()
+            self._finished.set()
+
+    def _monitor_passes(self, watcher: Optional[_LogWatcher], exit_fd: Optional[int]) -> None:
         while not self._stop_flag.is_set():
             if self.process and self.process.poll() is not None:
-                # Process finished
+                # Process finished: pick up its last output before the final check
+                if self._drain_thread:
+                    self._drain_thread.join(timeout=5)
+                self._parse_log_progress()
                 self._check_completion_status()
                 break
 
@@ -239,11 +773,11 @@ class BackgroundMonitor:
             # Periodically show log summary (every 60 seconds)
             if self.show_log_updates and self.log_file:
                 current_time = time.time()
-                if current_time - self._last_log_display >= 60:
+                if current_time - self._last_log_display >= 60 and self._log_position != self._last_summary_position:
+                    # Skip the summary entirely when the log hasn't grown since the last one
                     self._last_log_display = current_time
-                    log_path = self.cwd / self.log_file
-                    if log_path.exists():
-                        print_log_summary(log_path, self.task_id)
+                    self._last_summary_position = self._log_position
+                    print_log_summary(self.cwd / self.log_file, self.task_id, lines=self._recent_lines(100))
 
             # Adaptive polling: check more frequently at the start (when errors are most likely)
             elapsed = time.time() - self.progress.started_at
@@ -254,7 +788,26 @@ class BackgroundMonitor:
             else:  # After 5 minutes: use configured interval
                 poll_time = self.poll_interval
 
-            time.sleep(poll_time)
+            self._wait_for_update(watcher, exit_fd, poll_time)
+
+    def _wait_for_update(
+        self, watcher: Optional[_LogWatcher], exit_fd: Optional[int], poll_time: float
+    ) -> None:
+        """Sleep until the next pass: up to `poll_time`, or sooner on a log write or process exit."""
+        if watcher is None:
+            if exit_fd is None:
+                self._stop_flag.wait(poll_time)
+            else:
+                # stop() terminates the process, so this also wakes on stop
+                select.select([exit_fd], [], [], poll_time)
+            return
+        started = time.monotonic()
+        if watcher.wait(poll_time, exit_fd):
+            return  # exited: run the final pass right away
+        # Coalesce bursts of writes into at most one pass per _MIN_POLL
+        rest = _MIN_POLL - (time.monotonic() - started)
+        if rest > 0:
+            self._stop_flag.wait(rest)
 
     def _parse_log_progress(self) -> None:
         """Parse log file for progress indicators (epoch, metrics, etc.)."""
@@ -262,60 +815,129 @@ class BackgroundMonitor:
             return
 
         log_path = self.cwd / self.log_file
-        if not log_path.exists():
+        try:
+            # One stat() is enough to tell that nothing was appended since the last poll
+            st = os.stat(log_path)
+            if st.st_size <= self._log_position:
+                return
+        except OSError:
             return
 
         try:
-            with open(log_path, "r") as f:
-                f.seek(self._log_position)
-                new_lines = f.readlines()
-                self._log_position = f.tell()
-
-            for line in new_lines:
-                self._parse_line(line.strip())
-                self.progress.last_update = time.time()
+            if self._log_id != (st.st_dev, st.st_ino):
+                # First read, or the log was replaced: (re)open it once and keep the fd
+                self._close_log()
+                self._log_fd = os.open(log_path, os.O_RDONLY)
+                fst = os.fstat(self._log_fd)
+                self._log_id = (fst.st_dev, fst.st_ino)
+            # At most _TAIL_BYTES per read, so a burst of output is never held whole
+            while self._log_position < st.st_size:
+                os.lseek(self._log_fd, self._log_position, os.SEEK_SET)
+                data = os.read(self._log_fd, min(st.st_size - self._log_position, _TAIL_BYTES))
+                if not data:
+                    break
+                if self._log_position + len(data) < st.st_size:
+                    # More to come: end this chunk on a line break so no line is split
+                    cut = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+                    if cut:
+                        data = data[:cut]
+                self._log_position += len(data)
+                self._ingest(data)
 
         except Exception as e:
             # Silently ignore read errors (file might be being written to)
             pass
 
+    def _close_log(self) -> None:
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = self._log_id = None
+
+    def _drain_pipe(self) -> None:
+        """Read the task's stdout until EOF, ingesting whole lines as they arrive."""
+        pipe = self.process.stdout
+        pending = b""
+        try:
+            while True:
+                chunk = os.read(pipe.fileno(), _PIPE_CHUNK)
+                if not chunk:
+                    break
+                data = pending + chunk
+                cut = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+                pending = data[cut:]
+                if cut:
+                    self._ingest(data[:cut])
+                elif len(pending) >= _TAIL_BYTES:
+                    # No line break in sight: don't let one line grow without bound
+                    self._ingest(pending)
+                    pending = b""
+            if pending:
+                self._ingest(pending)
+        except OSError:
+            pass
+        finally:
+            pipe.close()
+
+    def _ingest(self, data: bytes) -> None:
+        """Take in newly written task output: keep it for completion checks and parse progress."""
+        lines = data.splitlines(keepends=True)
+        with self._ingest_lock:
+            self._tail.extend(lines)
+            self._tail_size += len(data)
+            self._trim_tail()
+            self._unscanned += data
+            if len(self._unscanned) > _TAIL_BYTES:
+                self._scan_unscanned()
+            if self.progress.current_metric is None:
+                self.progress.current_metric = {}
+            for line in lines:
+                # Only decode lines that can carry an epoch or a metric
+                if _PROGRESS_HINT_RE.search(line):
+                    # No strip(): the epoch/metric regexes search within the line
+                    self._parse_line(line.decode("utf-8", "replace"))
+            self.progress.last_update = time.time()
+
+    def _trim_tail(self) -> None:
+        """Drop the oldest lines beyond _TAIL_LINES or _TAIL_BYTES (caller holds _ingest_lock)."""
+        tail = self._tail
+        while len(tail) > 1 and (len(tail) > _TAIL_LINES or self._tail_size > _TAIL_BYTES):
+            self._tail_size -= len(tail.popleft())
+        if self._tail_size > _TAIL_BYTES:
+            # A single line longer than the cap: keep its end
+            tail[0] = tail[0][-_TAIL_BYTES:]
+            self._tail_size = len(tail[0])
+
+    def _scan_unscanned(self) -> None:
+        """Check _unscanned for completion, folding the result into _scan_outcome.
+
+        Caller holds _ingest_lock. Only what was appended since the last check is scanned, plus a little of
+        the previous chunk so a match straddling the boundary isn't missed.
+        """
+        buf = self._scan_overlap + self._unscanned
+        self._unscanned.clear()
+        self._scan_overlap = buf[-_SCAN_OVERLAP:]
+        outcome = self.patterns.scan(buf)
+        # A failure anywhere wins over a success, as it would in one big scan
+        if outcome == "failed" and self._scan_outcome != "failed":
+            self._scan_outcome, self._failed_chunk = outcome, bytes(buf)
+        elif outcome == "completed" and self._scan_outcome is None:
+            self._scan_outcome = outcome
+
     def _parse_line(self, line: str) -> None:
         """Parse a single log line for progress info."""
-        # Epoch pattern: "Epoch 5/60" or "Epoch: 5/60"
-        epoch_match = re.search(r'epoch[:\s]*(\d+)\s*/\s*(\d+)', line, re.IGNORECASE)
-        if epoch_match:
-            self.progress.current_epoch = int(epoch_match.group(1))
-            self.progress.total_epochs = int(epoch_match.group(2))
-
-        # Metric patterns: "Loss: 1.234", "AUC=0.985", "Pixel AP: 58.3%", "I-AUROC=0.9917"
-        metric_patterns = [
-            (r'loss[:\s]+([\d.]+)', 'loss'),
-            (r'auc[:\s=]+([\d.]+)', 'auc'),
-            (r'I-AUROC[:\s=]+([\d.]+)', 'I-AUROC'),
-            (r'P-AUROC[:\s=]+([\d.]+)', 'P-AUROC'),
-            (r'I-AP[:\s=]+([\d.]+)', 'I-AP'),
-            (r'P-AP[:\s=]+([\d.]+)', 'P-AP'),
-            (r'I-F1[:\s=]+([\d.]+)', 'I-F1'),
-            (r'P-F1[:\s=]+([\d.]+)', 'P-F1'),
-            (r'AUPRO[:\s=]+([\d.]+)', 'AUPRO'),
-            (r'pixel\s*ap[:\s]+([\d.]+)', 'pixel_ap'),
-            (r'image\s*auc[:\s]+([\d.]+)', 'image_auc'),
-        ]
+        line_lower = line.lower()
+        epoch = _parse_epoch(line, line_lower)
+        if epoch:
+            self.progress.current_epoch, self.progress.total_epochs = epoch
 
         if self.progress.current_metric is None:
             self.progress.current_metric = {}
 
-        for pattern, metric_name in metric_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    # Convert percentage to decimal if needed
-                    if value > 1.0 and metric_name != 'loss':
-                        value = value / 100.0
-                    self.progress.current_metric[metric_name] = value
-                except ValueError:
-                    pass
+        _parse_metrics(line, line_lower, self.progress.record_metric)
+
+    def _recent_lines(self, n: int) -> List[str]:
+        """Last `n` lines of the log seen so far, decoded."""
+        return _decode_lines(b"".join(list(self._tail)[-n:]))
 
     def _check_completion_status(self) -> bool:
         """Check if task has completed (success or failure). Returns True if completed."""
@@ -327,94 +949,103 @@ class BackgroundMonitor:
                 return True
 
         # Check log content for patterns
-        if not self.log_file:
-            return False
-
-        log_path = self.cwd / self.log_file
-        if not log_path.exists():
-            return False
-
         try:
-            # Read last 1000 lines (don't read entire huge log)
-            with open(log_path, "r") as f:
-                lines = f.readlines()[-1000:]
-                content = "\n".join(lines)
+            # Text is decoded only to report an error
+            with self._ingest_lock:
+                if self._unscanned:
+                    self._scan_unscanned()
+                outcome, failed_chunk = self._scan_outcome, self._failed_chunk
+                self._scan_outcome, self._failed_chunk = None, b""
 
             # Check failure patterns first
-            for pattern in self.patterns.failure_patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    self.progress.status = "failed"
-                    # Extract detailed error context
-                    self.progress.error_message = self._extract_error_details(content, pattern)
-                    return True
+            if outcome == "failed":
+                self.progress.status = "failed"
+                # Extract detailed error context from the recent lines
+                with self._ingest_lock:
+                    tail = b"".join(self._tail)
+                content = "\n".join(_decode_lines(tail))
+                match = self.patterns.first_failure(content)
+                if not match:
+                    # The failure came in a burst longer than the kept tail
+                    content = "\n".join(_decode_lines(failed_chunk))
+                    match = self.patterns.first_failure(content)
+                if match:
+                    self.progress.error_message = self._extract_error_details(content, match)
+                return True
 
             # Check success patterns
-            for pattern in self.patterns.success_patterns:
-                if re.search(pattern, content, re.IGNORECASE):
-                    self.progress.status = "completed"
-                    return True
+            if outcome == "completed":
+                self.progress.status = "completed"
+                return True
 
         except Exception:
             pass
 
         return False
 
-    def _extract_error_details(self, log_content: str, error_pattern: str) -> str:
-        """Extract comprehensive error details from log content."""
-        lines = log_content.split('\n')
-        error_lines = []
-
-        # Find the error location
-        for i, line in enumerate(lines):
-            if re.search(error_pattern, line, re.IGNORECASE):
-                # Include context: 5 lines before, error line, and up to 20 lines after (for traceback)
-                start_idx = max(0, i - 5)
-                end_idx = min(len(lines), i + 21)
-                error_lines = lines[start_idx:end_idx]
+    def _extract_error_details(self, log_content: str, match: re.Match) -> str:
+        """Extract comprehensive error details around a failure match."""
+        if "\n" in match.group(0):
+            # Match spans lines: just return the matched portion with some context
+            start = max(0, match.start() - 200)
+            end = min(len(log_content), match.end() + 200)
+            return log_content[start:end]
+
+        # Include context: 5 lines before, error line, and up to 20 lines after (for traceback).
+        # Walk line boundaries out from the match instead of splitting the whole buffer.
+        begin = log_content.rfind('\n', 0, match.start()) + 1
+        for _ in range(5):
+            if begin == 0:
                 break
-
-        if not error_lines:
-            # Fallback: just return the matched portion
-            match = re.search(error_pattern, log_content, re.IGNORECASE)
-            if match:
-                start = max(0, match.start() - 200)
-                end = min(len(log_content), match.end() + 200)
-                return log_content[start:end]
-
-        return '\n'.join(error_lines)
+            begin = log_content.rfind('\n', 0, begin - 1) + 1
+        end = log_content.find('\n', match.start())
+        for _ in range(20):
+            if end == -1:
+                break
+            end = log_content.find('\n', end + 1)
+        return log_content[begin:] if end == -1 else log_content[begin:end]
+
+    def _progress_details(self) -> List[str]:
+        """Epoch and metric parts of the live status line."""
+        parts = []
+        if self.progress.current_epoch and self.progress.total_epochs:
+            progress_pct = (self.progress.current_epoch / self.progress.total_epochs) * 100
+            parts.append(f"Epoch {self.progress.current_epoch}/{self.progress.total_epochs} ({progress_pct:.0f}%)")
+
+        if self.progress.current_metric:
+            metric_strs = []
+            for k, v in self.progress.current_metric.items():
+                if k == 'loss':
+                    metric_strs.append(f"Loss={v:.4f}")
+                else:
+                    metric_strs.append(f"{k.upper()}={v:.2%}")
+            if metric_strs:
+                parts.append(" | ".join(metric_strs))
+        return parts
 
     def _show_live_progress(self) -> None:
         """Show live progress with spinner until completion."""
         spinner_idx = 0
+        details_stamp, details = None, []
 
-        while self.progress.status == "running":
+        # Also stop once the monitor loop is done: a task that exits without
+        # matching any pattern stays "running" until wait() settles it
+        while self.progress.status == "running" and not self._finished.is_set():
             elapsed = time.time() - self.progress.started_at
             elapsed_str = _format_duration(elapsed)
 
-            # Build status line
-            parts = [f"{SPINNER[spinner_idx % len(SPINNER)]}"]
+            # Epoch/metric text only changes when new output was parsed
+            stamp = self.progress.last_update
+            if stamp != details_stamp:
+                details_stamp, details = stamp, self._progress_details()
 
-            if self.progress.current_epoch and self.progress.total_epochs:
-                progress_pct = (self.progress.current_epoch / self.progress.total_epochs) * 100
-                parts.append(f"Epoch {self.progress.current_epoch}/{self.progress.total_epochs} ({progress_pct:.0f}%)")
-
-            if self.progress.current_metric:
-                metric_strs = []
-                for k, v in self.progress.current_metric.items():
-                    if k == 'loss':
-                        metric_strs.append(f"Loss={v:.4f}")
-                    else:
-                        metric_strs.append(f"{k.upper()}={v:.2%}")
-                if metric_strs:
-                    parts.append(" | ".join(metric_strs))
-
-            parts.append(f"[{elapsed_str}]")
-
-            status_line = "  " + " ".join(parts)
-            sys.stderr.write(f"\r{status_line}" + " " * 10)
+            # Build status line
+            status_line = "  " + " ".join([SPINNER[spinner_idx % len(SPINNER)], *details, f"[{elapsed_str}]"])
+            sys.stderr.write(f"\r{status_line}{' ' * 10}")
             sys.stderr.flush()
 
-            time.sleep(0.3)
+            # Tick every 0.3s, but return as soon as monitoring finishes
+            self._finished.wait(0.3)
             spinner_idx += 1
 
         # Clear spinner line
@@ -448,11 +1079,7 @@ def get_log_content(log_path: Path, max_lines: int = 500) -> str:
         return ""
 
     try:
-        with open(log_path, "r") as f:
-            lines = f.readlines()
-            # Return last max_lines
-            relevant_lines = lines[-max_lines:] if len(lines) > max_lines else lines
-            return "".join(relevant_lines)
+        return "".join(_tail_lines(log_path, max_lines))
     except Exception:
         return ""
 
@@ -469,6 +1096,17 @@ def _format_duration(seconds: float) -> str:
         return f"{hours}h {minutes}m"
 
 
+# Keep lines with: epoch, loss, metrics, errors, warnings, completion
+_IMPORTANT_KEYWORDS = (
+    'epoch', 'loss', 'auc', 'auroc', 'accuracy', 'error', 'warning',
+    'completed', 'failed', 'metric', 'pixel ap', 'image auc',
+    'i-auroc', 'p-auroc', 'i-ap', 'p-ap', 'i-f1', 'p-f1', 'aupro',
+    'mean', '[baseline]', '[train]',
+)
+# One scan per (already lowercased) line instead of a substring test per keyword
+_IMPORTANT_RE = re.compile('|'.join(re.escape(k) for k in _IMPORTANT_KEYWORDS))
+
+
 def show_log_tail(
     log_path: Path,
     lines: int = 20,
@@ -489,25 +1127,15 @@ def show_log_tail(
         return
 
     try:
-        with open(log_path, "r") as f:
-            all_lines = f.readlines()
-
-        # Get last N lines
-        tail_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        # Get last N lines, lowercased once for both the filter and the colouring
+        tail_lines = [(line, line.lower()) for line in _tail_lines(log_path, lines)]
 
         if filter_important:
             # Filter for important lines
-            important_lines = []
-            for line in tail_lines:
-                line_lower = line.lower()
-                # Keep lines with: epoch, loss, metrics, errors, warnings, completion
-                if any(keyword in line_lower for keyword in [
-                    'epoch', 'loss', 'auc', 'auroc', 'accuracy', 'error', 'warning',
-                    'completed', 'failed', 'metric', 'pixel ap', 'image auc',
-                    'i-auroc', 'p-auroc', 'i-ap', 'p-ap', 'i-f1', 'p-f1', 'aupro',
-                    'mean', '[baseline]', '[train]'
-                ]):
-                    important_lines.append(line)
+            important_lines = [
+                (line, line_lower) for line, line_lower in tail_lines
+                if _IMPORTANT_RE.search(line_lower)
+            ]
 
             # If filtering removes everything, show all
             if important_lines:
@@ -518,14 +1146,13 @@ def show_log_tail(
         print(_c(f"\n  📄 Recent Log (last {len(tail_lines)} lines):", "cyan", "bold"))
         print(_c("  " + "─" * 60, "dim"))
 
-        for line in tail_lines:
+        for line, line_lower in tail_lines:
             line = line.strip()
             if not line:
                 continue
 
             # Colorize based on content
             if colorize:
-                line_lower = line.lower()
                 if 'error' in line_lower or 'exception' in line_lower or 'failed' in line_lower:
                     print(_c(f"  {line}", "red"))
                 elif 'warning' in line_lower:
@@ -551,87 +1178,72 @@ def get_log_summary(log_path: Path) -> Dict[str, Any]:
 
     Returns dict with: current_epoch, total_epochs, latest_metrics, errors, status
     """
-    summary = {
-        "current_epoch": None,
-        "total_epochs": None,
-        "latest_metrics": {},
-        "errors": [],
-        "warnings": [],
-        "status": "running"
-    }
-
     if not log_path.exists():
-        return summary
+        return get_log_summary_from_lines([])
 
     try:
-        with open(log_path, "r") as f:
-            lines = f.readlines()
-
         # Analyze last 100 lines for recent status
-        recent_lines = lines[-100:] if len(lines) > 100 else lines
-
-        for line in recent_lines:
-            line = line.strip()
-
-            # Parse epoch
-            epoch_match = re.search(r'epoch[:\s]*(\d+)\s*/\s*(\d+)', line, re.IGNORECASE)
-            if epoch_match:
-                summary["current_epoch"] = int(epoch_match.group(1))
-                summary["total_epochs"] = int(epoch_match.group(2))
-
-            # Parse metrics
-            metric_patterns = [
-                (r'loss[:\s]+([\d.]+)', 'loss'),
-                (r'auc[:\s=]+([\d.]+)', 'auc'),
-                (r'I-AUROC[:\s=]+([\d.]+)', 'I-AUROC'),
-                (r'P-AUROC[:\s=]+([\d.]+)', 'P-AUROC'),
-                (r'I-AP[:\s=]+([\d.]+)', 'I-AP'),
-                (r'P-AP[:\s=]+([\d.]+)', 'P-AP'),
-                (r'I-F1[:\s=]+([\d.]+)', 'I-F1'),
-                (r'P-F1[:\s=]+([\d.]+)', 'P-F1'),
-                (r'AUPRO[:\s=]+([\d.]+)', 'AUPRO'),
-                (r'pixel\s*ap[:\s]+([\d.]+)', 'pixel_ap'),
-                (r'image\s*auc[:\s]+([\d.]+)', 'image_auc'),
-                (r'accuracy[:\s]+([\d.]+)', 'accuracy'),
-            ]
-
-            for pattern, metric_name in metric_patterns:
-                match = re.search(pattern, line, re.IGNORECASE)
-                if match:
-                    try:
-                        value = float(match.group(1))
-                        if value > 1.0 and metric_name != 'loss':
-                            value = value / 100.0
-                        summary["latest_metrics"][metric_name] = value
-                    except ValueError:
-                        pass
-
-            # Detect errors
-            if re.search(r'error:|exception:', line, re.IGNORECASE):
-                if len(summary["errors"]) < 3:  # Keep last 3 errors
-                    summary["errors"].append(line[:150])
-
-            # Detect warnings
-            if 'warning' in line.lower():
-                if len(summary["warnings"]) < 3:
-                    summary["warnings"].append(line[:150])
-
-            # Check completion
-            if re.search(r'(?i)training\s+completed|experiment\s+(?:finished|completed)', line):
-                summary["status"] = "completed"
-            elif re.search(r'(?i)failed|error:', line):
-                summary["status"] = "failed"
-
-        return summary
-
+        return get_log_summary_from_lines(_tail_lines(log_path, 100))
     except Exception as e:
+        summary = get_log_summary_from_lines([])
         summary["errors"] = [f"Failed to read log: {e}"]
         return summary
 
 
-def print_log_summary(log_path: Path, task_id: str = "Task") -> None:
-    """Print a concise summary of the log file."""
-    summary = get_log_summary(log_path)
+def get_log_summary_from_lines(recent_lines: List[str]) -> Dict[str, Any]:
+    """Like get_log_summary, for log lines already in memory."""
+    summary = {
+        "current_epoch": None,
+        "total_epochs": None,
+        "latest_metrics": {},
+        "errors": [],
+        "warnings": [],
+        "status": "running"
+    }
+    metrics: Dict[str, float] = {}
+    errors: List[str] = []
+    warnings: List[str] = []
+    status = None
+
+    for line in recent_lines:
+        line_lower = line.lower()
+        if not _SUMMARY_HINT_RE.search(line_lower):
+            continue  # nothing below can match this line
+        line = line.strip()  # only lines that may be reported need trimming
+
+        # Parse epoch
+        epoch = _parse_epoch(line, line_lower)
+        if epoch:
+            summary["current_epoch"], summary["total_epochs"] = epoch
+
+        # Parse metrics (latest value wins, in order of first appearance)
+        _parse_summary_metrics(line, line_lower, metrics.__setitem__)
+
+        # Detect errors (keep the first 3: the earliest is usually the root cause)
+        if len(errors) < 3 and ('error:' in line_lower or 'exception:' in line_lower):
+            errors.append(line[:150])
+
+        # Detect warnings (keep the first 3)
+        if len(warnings) < 3 and 'warning' in line_lower:
+            warnings.append(line[:150])
+
+        # Check completion
+        if ('completed' in line_lower or 'finished' in line_lower) and _SUMMARY_COMPLETED_RE.search(line):
+            status = "completed"
+        elif 'failed' in line_lower or 'error:' in line_lower:
+            status = "failed"
+
+    summary["latest_metrics"] = metrics
+    summary["errors"] = errors
+    summary["warnings"] = warnings
+    if status:
+        summary["status"] = status
+    return summary
+
+
+def print_log_summary(log_path: Path, task_id: str = "Task", lines: Optional[List[str]] = None) -> None:
+    """Print a concise summary of the log file (or of `lines` already read from it)."""
+    summary = get_log_summary(log_path) if lines is None else get_log_summary_from_lines(lines)
 
     # Don't print if there's no meaningful information
     has_info = (
@@ -738,6 +1350,21 @@ def run_background_task(
 
 # ─── Integration with research steps ─────────────────────────────────────────
 
+@functools.lru_cache(maxsize=64)
+def _custom_patterns(success_pattern: str) -> CompletionPattern:
+    """Default patterns plus an agent-supplied success pattern, built once per pattern.
+
+    CompletionPattern compiles its regexes (and any Aho-Corasick/Hyperscan
+    matchers) on construction and is read-only afterwards, so monitors for
+    tasks announcing the same pattern can share one.
+    """
+    return CompletionPattern(
+        success_patterns=[success_pattern, *DEFAULT_PATTERNS.success_patterns],
+        failure_patterns=DEFAULT_PATTERNS.failure_patterns,
+        failure_keywords=DEFAULT_PATTERNS.failure_keywords,
+    )
+
+
 def parse_experiment_command(agent_output: str) -> Optional[Dict[str, Any]]:
     """
     Parse agent output to extract background command details.
@@ -759,28 +1386,24 @@ def parse_experiment_command(agent_output: str) -> Optional[Dict[str, Any]]:
     info: Dict[str, Any] = {}
 
     # Extract command
-    cmd_match = re.search(r'COMMAND:\s*(.+?)(?:\n|$)', agent_output, re.IGNORECASE)
+    cmd_match = _COMMAND_RE.search(agent_output)
     if cmd_match:
         info['command'] = cmd_match.group(1).strip()
     else:
         return None  # Command is required
 
     # Extract log file
-    log_match = re.search(r'LOG_FILE:\s*(.+?)(?:\n|$)', agent_output, re.IGNORECASE)
+    log_match = _LOG_FILE_RE.search(agent_output)
     if log_match:
         info['log_file'] = log_match.group(1).strip()
 
     # Extract completion pattern
-    pattern_match = re.search(r'COMPLETION_PATTERN:\s*(.+?)(?:\n|$)', agent_output, re.IGNORECASE)
+    pattern_match = _COMPLETION_PATTERN_RE.search(agent_output)
     if pattern_match:
-        custom_patterns = CompletionPattern(
-            success_patterns=[pattern_match.group(1).strip(), *DEFAULT_PATTERNS.success_patterns],
-            failure_patterns=DEFAULT_PATTERNS.failure_patterns,
-        )
-        info['patterns'] = custom_patterns
+        info['patterns'] = _custom_patterns(pattern_match.group(1).strip())
 
     # Extract estimated time
-    time_match = re.search(r'ESTIMATED_TIME:\s*(.+?)(?:\n|$)', agent_output, re.IGNORECASE)
+    time_match = _ESTIMATED_TIME_RE.search(agent_output)
     if time_match:
         info['estimated_time'] = time_match.group(1).strip()
 
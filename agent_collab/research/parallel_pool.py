@@ -3,7 +3,6 @@ from __future__ import annotations
 
 import sys
 import threading
-import time
 from dataclasses import dataclass
 from typing import Optional
 
@@ -15,15 +14,21 @@ SPINNER = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
 _USE_COLOR = sys.stderr.isatty()
 
 
+_CODES = {
+    "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
+    "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
+    "red": "\033[91m",  "magenta": "\033[95m",
+}
+_STYLE_CACHE: dict = {}  # styles -> joined escape prefix
+
+
 def _c(text: str, *styles: str) -> str:
     if not _USE_COLOR:
         return text
-    codes = {
-        "reset": "\033[0m", "bold": "\033[1m", "dim": "\033[2m",
-        "cyan": "\033[96m", "green": "\033[92m", "yellow": "\033[93m",
-        "red": "\033[91m",  "magenta": "\033[95m",
-    }
-    return "".join(codes.get(s, "") for s in styles) + text + codes["reset"]
+    prefix = _STYLE_CACHE.get(styles)
+    if prefix is None:
+        prefix = _STYLE_CACHE[styles] = "".join(_CODES.get(s, "") for s in styles)
+    return prefix + text + _CODES["reset"]
 
 
 @dataclass
@@ -53,12 +58,20 @@ class ParallelPool:
 
         results: dict[str, tuple] = {}
         lock = threading.Lock()
+        pending = [len(tasks)]  # workers still running, guarded by lock
+        all_done = threading.Event()
 
         def _worker(task: PoolTask):
-            agent = self.claude if task.agent == "claude" else self.codex
-            res = agent.run(task.prompt, cwd=self.cwd)
-            with lock:
-                results[task.role] = (task, res)
+            try:
+                agent = self.claude if task.agent == "claude" else self.codex
+                res = agent.run(task.prompt, cwd=self.cwd)
+                with lock:
+                    results[task.role] = (task, res)
+            finally:
+                with lock:
+                    pending[0] -= 1
+                    if not pending[0]:
+                        all_done.set()
 
         threads = [threading.Thread(target=_worker, args=(t,), daemon=True) for t in tasks]
 
@@ -66,16 +79,15 @@ class ParallelPool:
 
         def _spin():
             i = 0
+            roles = ", ".join(t.role for t in tasks)
+            label = _c(self.step_label, "yellow")
             while not spin_done.is_set():
-                with lock:
-                    n_done = len(results)
-                roles = ", ".join(t.role for t in tasks)
-                label = _c(self.step_label, "yellow")
+                n_done = len(results)  # a single read; workers only ever add
                 sys.stderr.write(
                     f"\r  {SPINNER[i % len(SPINNER)]}  [{label}] ∥ {roles}  ({n_done}/{len(tasks)} done)"
                 )
                 sys.stderr.flush()
-                time.sleep(0.12)
+                spin_done.wait(0.12)  # returns at once when the pool finishes
                 i += 1
             sys.stderr.write("\r" + " " * 80 + "\r")
             sys.stderr.flush()
@@ -88,9 +100,10 @@ class ParallelPool:
             t.start()
 
         try:
-            for t in threads:
-                while t.is_alive():
-                    t.join(timeout=0.1)
+            # Set by the last worker to finish; the timeout only keeps Ctrl-C
+            # responsive where a blocking wait can't be interrupted
+            while not all_done.wait(timeout=1.0):
+                pass
         except KeyboardInterrupt:
             spin_done.set()
             sys.stderr.write("\r" + " " * 80 + "\r")
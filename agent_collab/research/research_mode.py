@@ -174,8 +174,8 @@ def run_round(state, round_num, total_rounds, claude, codex, cwd, cfg, resume_ro
     state.save()  # This also saves memory
 
     # Print memory stats
-    n_insights = len([e for e in state.memory.entries if e.type in ("insight", "success")])
-    n_mistakes = len([e for e in state.memory.entries if e.type in ("mistake", "failure")])
+    n_insights = state.memory.count("insight", "success")
+    n_mistakes = state.memory.count("mistake", "failure")
     if n_insights or n_mistakes:
         print(_c(f"\n  📚 Research Memory: {n_insights} insights, {n_mistakes} mistakes recorded", "dim"))
 
@@ -353,15 +353,15 @@ def run_research_session(goal, total_rounds, claude, codex, cwd, cfg,
             print(_c(f"  ⚠️  Failed to generate session index: {e}", "yellow", "dim"))
 
     # Save memory and show location
-    memory_path = state.memory.save(Path(cwd))
+    memory_path = state.memory.finalize(Path(cwd))
     print(_c(f"\nReport    → {report_path}", "dim"))
     print(_c(f"Learnings → {memory_path}", "dim"))
     print(_c(f"State     → {state.save()}", "dim"))
 
     # Print memory summary
-    n_total = len(state.memory.entries)
-    n_insights = len([e for e in state.memory.entries if e.type in ("insight", "success")])
-    n_mistakes = len([e for e in state.memory.entries if e.type in ("mistake", "failure")])
+    n_total = state.memory.total_entries
+    n_insights = state.memory.count("insight", "success")
+    n_mistakes = state.memory.count("mistake", "failure")
     print(_c(f"\n📚 Research Memory Summary:", "cyan", "bold"))
     print(_c(f"  Total entries: {n_total}", "dim"))
     print(_c(f"  💡 Insights/Successes: {n_insights}", "green"))
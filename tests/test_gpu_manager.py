@@ -0,0 +1,42 @@
+"""Tests for agent_collab.research.gpu_manager."""
+import pytest
+
+from agent_collab.research import gpu_manager
+from agent_collab.research.gpu_manager import GPUInfo
+
+
+def _gpu(index, utilization=0, memory_used=0):
+    return GPUInfo(index, "Test GPU", 24576, memory_used, 24576 - memory_used, utilization)
+
+
+@pytest.fixture
+def fake_gpus(monkeypatch):
+    gpus = []
+    monkeypatch.setattr(gpu_manager, "detect_gpus", lambda: list(gpus))
+    return gpus
+
+
+def test_more_gpus_per_experiment_than_detected_raises(fake_gpus):
+    fake_gpus[:] = [_gpu(0), _gpu(1)]
+    with pytest.raises(ValueError):
+        gpu_manager.allocate_gpus_to_experiments(2, gpus_per_experiment=3)
+
+
+def test_multi_gpu_experiment_is_never_given_fewer_gpus(fake_gpus):
+    fake_gpus[:] = [_gpu(0), _gpu(1), _gpu(2)]
+    allocation = gpu_manager.allocate_gpus_to_experiments(
+        2, gpus_per_experiment=2, max_experiments_per_gpu=1
+    )
+    assert len(allocation[0]) == 2
+    assert allocation[1] == []
+
+
+def test_rebalance_fills_gpu_up_to_its_cap(fake_gpus):
+    fake_gpus[:] = [_gpu(0)]
+    allocator = gpu_manager.GPUAllocator(max_experiments_per_gpu=2)
+    allocator.allocation = {0: [0], 1: [0], 2: [0]}
+    # Experiment 0 is running and now shows up in the driver's reading
+    fake_gpus[:] = [_gpu(0, utilization=90, memory_used=8192)]
+    changed = allocator.rebalance([1, 2], force=True)
+    assert allocator.allocation[1] == [0]
+    assert changed == {2: []}
@@ -0,0 +1,20 @@
+"""Tests for agent_collab.research.memory."""
+from agent_collab.research.memory import ENTRIES_FILE, ResearchMemory
+
+
+def test_load_round_trips_entries(tmp_path):
+    memory = ResearchMemory(goal="goal")
+    memory.add_insight(1, "analyze", "lower learning rate helps")
+    memory.save(tmp_path)
+    loaded = ResearchMemory.load(tmp_path)
+    assert loaded.total_entries == 1
+
+
+def test_load_warns_when_entry_log_is_missing(tmp_path, capsys):
+    memory = ResearchMemory(goal="goal")
+    memory.add_insight(1, "analyze", "lower learning rate helps")
+    memory.save(tmp_path)
+    (tmp_path / ENTRIES_FILE).unlink()
+    loaded = ResearchMemory.load(tmp_path)
+    assert loaded.total_entries == 0
+    assert ENTRIES_FILE in capsys.readouterr().err
@@ -0,0 +1,146 @@
+"""Tests for agent_collab.research.monitor."""
+import random
+import re
+
+import pytest
+
+from agent_collab.research.monitor import (
+    DEFAULT_PATTERNS,
+    BackgroundMonitor,
+    _SCAN_OVERLAP,
+    _lowered_source,
+    _tail_lines,
+    get_log_summary_from_lines,
+)
+
+
+SAMPLES = [
+    b"Training completed in 3h",
+    b"EXPERIMENT FINISHED",
+    b"All Tasks Complete",
+    b"Final Results: AUC=0.98",
+    b"\xe2\x9c\x93 run complete",
+    b"Traceback (most recent call last):",
+    b"RuntimeError: CUDA out of memory",
+    b"cuda out of memory",
+    b"ModuleNotFoundError: No module named 'x'",
+    b"Process exited with exit code: 2",
+    b"Epoch 3/10 loss: 0.42",
+    b"_", b"^", b"`", b"\\", b"]", b"[", b"A", b"a", b"Z", b"z", b"-", b"0",
+]
+
+
+def _strip_flag(pattern: str) -> str:
+    return pattern[4:] if pattern.startswith("(?i)") else pattern
+
+
+def _assert_same_matches(source: str) -> None:
+    lowered = _lowered_source(source.encode())
+    assert lowered is not None
+    caseless = re.compile(source.encode(), re.IGNORECASE)
+    rewritten = re.compile(lowered)
+    for text in SAMPLES:
+        assert bool(caseless.search(text)) == bool(rewritten.search(text.lower())), (source, text)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [_strip_flag(p) for p in DEFAULT_PATTERNS.success_patterns + DEFAULT_PATTERNS.failure_patterns],
+)
+def test_lowered_source_matches_caseless_default_patterns(source):
+    _assert_same_matches(source)
+
+
+@pytest.mark.parametrize("source", [r"[]a-z]", r"[^]a-z]", r"[]]", r"[^]]", r"[\]a]", r"x[]_]y"])
+def test_lowered_source_leading_bracket_stays_in_class(source):
+    _assert_same_matches(source)
+
+
+@pytest.mark.parametrize("source", [r"[]A-z]", r"[^]A-Z]", r"[A-z]", r"(?s)a", r"\x41", r"\1"])
+def test_lowered_source_rejects_unsafe_rewrites(source):
+    assert _lowered_source(source.encode()) is None
+
+
+def _readlines_tail(path, n):
+    with open(path) as f:
+        return f.readlines()[-n:] if n > 0 else []
+
+
+def test_tail_lines_matches_readlines(tmp_path):
+    rng = random.Random(1234)
+    path = tmp_path / "log.txt"
+    breaks = ["\n", "\r", "\r\n"]
+    for _ in range(300):
+        lines = [
+            "x" * rng.randint(0, 40) + rng.choice(breaks) for _ in range(rng.randint(0, 60))
+        ]
+        if lines and rng.random() < 0.5:
+            lines[-1] = lines[-1].rstrip("\r\n")  # no trailing line break
+        path.write_bytes("".join(lines).encode())
+        n = rng.randint(0, 70)
+        block = rng.randint(1, 64)
+        assert _tail_lines(path, n, block=block) == _readlines_tail(path, n), (lines, n, block)
+
+
+def _file_monitor(tmp_path):
+    return BackgroundMonitor("t", "true", cwd=str(tmp_path), log_file="train.log", show_log_updates=False)
+
+
+def test_completion_scan_catches_failure_split_across_polls(tmp_path):
+    monitor = _file_monitor(tmp_path)
+    log = tmp_path / "train.log"
+    head = b"step ok\n" * 300
+    # The first half lands just inside the overlap kept from the first scan
+    first = head + b"x" * (_SCAN_OVERLAP - 20) + b"Traceback (most rec"
+    log.write_bytes(first)
+    monitor._parse_log_progress()
+    assert monitor._check_completion_status() is False
+
+    with open(log, "ab") as f:
+        f.write(b"ent call last)\n  File \"train.py\"\n")
+    monitor._parse_log_progress()
+    assert monitor._check_completion_status() is True
+    assert monitor.progress.status == "failed"
+
+
+def test_completion_scan_ignores_already_scanned_bytes(tmp_path):
+    monitor = _file_monitor(tmp_path)
+    log = tmp_path / "train.log"
+    log.write_bytes(b"Epoch 1/3 loss: 0.5\n")
+    monitor._parse_log_progress()
+    assert monitor._check_completion_status() is False
+    assert monitor._check_completion_status() is False
+    assert monitor.progress.current_epoch == 1
+
+
+@pytest.mark.parametrize(
+    "command, status",
+    [
+        ("printf 'Epoch 1/1 loss: 0.3\\nTraining completed\\n'", "completed"),
+        ("printf 'Epoch 1/1\\nValueError: bad shape\\n'", "failed"),
+    ],
+)
+def test_pipe_mode_detects_completion(tmp_path, command, status):
+    monitor = BackgroundMonitor("t", command, cwd=str(tmp_path), log_file=None, show_log_updates=False)
+    monitor.start()
+    progress = monitor.wait(show_spinner=False)
+    assert progress.status == status
+    assert progress.current_epoch == 1
+
+
+def test_log_summary_keeps_first_errors_and_metric_order():
+    lines = [
+        "Epoch 1/10 AUC: 0.70 loss: 2.0\n",
+        "ValueError: root cause\n",
+        "warning: slow dataloader\n",
+        "RuntimeError: second\n",
+        "Epoch 2/10 loss: 1.5 AUC: 0.80\n",
+        "KeyError: third\n",
+        "TypeError: fourth\n",
+    ]
+    summary = get_log_summary_from_lines(lines)
+    assert summary["current_epoch"] == 2
+    assert list(summary["latest_metrics"].items()) == [("loss", 1.5), ("auc", 0.80)]
+    assert summary["errors"] == ["ValueError: root cause", "RuntimeError: second", "KeyError: third"]
+    assert summary["warnings"] == ["warning: slow dataloader"]
+    assert summary["status"] == "failed"
@@ -0,0 +1,20 @@
+"""Tests for agent_collab.plan_cache."""
+import sqlite3
+from contextlib import closing
+
+from agent_collab import plan_cache
+
+
+def test_lookup_returns_hit(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_cache, "CACHE_PATH", tmp_path / "plan_cache.db")
+    plan_cache.store("add a login page", {"tasks": []})
+    hit = plan_cache.lookup("add a login page")
+    assert hit is not None and hit[2] == {"tasks": []}
+
+
+def test_lookup_treats_corrupt_row_as_miss(monkeypatch, tmp_path):
+    monkeypatch.setattr(plan_cache, "CACHE_PATH", tmp_path / "plan_cache.db")
+    plan_cache.store("add a login page", {"tasks": []})
+    with closing(sqlite3.connect(plan_cache.CACHE_PATH)) as conn, conn:
+        conn.execute("UPDATE plans SET plan_json = '{\"tasks\": ['")
+    assert plan_cache.lookup("add a login page") is None
@@ -0,0 +1,47 @@
+"""Tests for agent_collab.planner."""
+import subprocess
+import sys
+
+import pytest
+
+from agent_collab import planner
+
+
+def _spawn_noop(goal, cwd, prompt=None):
+    return subprocess.Popen([sys.executable, "-c", ""], stdout=subprocess.PIPE)
+
+
+def test_speculative_reraises_unexpected_worker_error(monkeypatch):
+    def broken_read(proc, timeout=120):
+        proc.stdout.close()
+        proc.wait()
+        raise OSError("read failed")
+
+    monkeypatch.setattr(planner, "_spawn_planner", _spawn_noop)
+    monkeypatch.setattr(planner, "_read_planner_output", broken_read)
+    with pytest.raises(OSError, match="read failed"):
+        planner._run_planner_speculative("goal", ".", 3)
+
+
+def test_read_planner_output_kills_planner_on_interrupt(monkeypatch):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"], stdout=subprocess.PIPE)
+
+    def interrupted_select(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(planner.select, "select", interrupted_select)
+    with pytest.raises(KeyboardInterrupt):
+        planner._read_planner_output(proc, timeout=30)
+    assert proc.returncode is not None
+
+
+def test_adapt_cached_plan_falls_back_on_timeout(monkeypatch):
+    def timed_out(proc, timeout=120):
+        proc.stdout.close()
+        proc.wait()
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+
+    monkeypatch.setattr(planner.plan_cache, "lookup", lambda goal: (0.95, "old goal", {"tasks": []}))
+    monkeypatch.setattr(planner, "_spawn_planner", _spawn_noop)
+    monkeypatch.setattr(planner, "_read_planner_output", timed_out)
+    assert planner._adapt_cached_plan("new goal", ".") is None